@@ -1,9 +1,9 @@
+import os
 import streamlit as st
 from streamlit_extras.badges import badge
-import matplotlib.pyplot as plt
-from PIL import Image
-from auxiliary import match_dict, matches, country_colors
-from get_viz import viz_dict
+from auxiliary import get_match_dict, get_matches
+from layout import SIDE_CHARTS, MIDDLE_CHARTS, MIN_ROWS, MAX_ROWS
+from profiling import DashboardProfile, PROFILE_LOG
 
 
 st.set_page_config(
@@ -17,6 +17,8 @@ st.markdown("*Platform enabling users to create their own match dashboards*")
 st.sidebar.image("https://raw.githubusercontent.com/AKapich/StatsBomb360_App/main/logos/EURO2024.png")
 
 # dropdown for choosing the match
+matches = get_matches()
+match_dict = get_match_dict()
 st.sidebar.title("Select Match")
 selected_match = st.sidebar.selectbox("Match:", match_dict.keys(), index=1)
 
@@ -26,17 +28,19 @@ home_team = selected_match.split(' - ')[0]
 away_team = selected_match.split(' - ')[1]
 competition_stage = matches[matches['match_id']==match_id].iloc[0]['competition_stage']
 
+# per panel timing and memory, shown in the sidebar and appended to EURO_PROFILE_LOG when set
+profiling = st.sidebar.checkbox('Profiling Mode', value=bool(os.environ.get('EURO_PROFILE')))
+# tracing allocations makes rendering several times slower, so it is a separate switch
+profile_memory = profiling and st.sidebar.checkbox('Track Memory')
+
 
-side_charts = ["None", "Passing Network", "Passing Sonars", "Shot xG", "Pass Heatmap", "xT Heatmap", "Pressure Heatmap",  "Action Territories",
-               'Progressive Passes', "Passes to Final 3rd", "Passes to Penalty Area"]
-middle_charts = ["None", "Overview", 'xT Momentum', 'xG Flow', "Voronoi Diagram", 'xT by Players', "Shot Types"]
 ##################################################################
 
 tab1, tab2 = st.tabs(["Creator Menu", "Dashboard Overview"])
 
 with tab1:
     symmetrical = st.checkbox('Symmetrical Layout')
-    n_rows = st.slider('Number of Rows', 2, 5, 3)
+    n_rows = st.slider('Number of Rows', MIN_ROWS, MAX_ROWS, 3)
     n_rows += 1
     cols = st.columns(3) 
     selected_options = [[None for _ in range(3)] for _ in range(n_rows)]
@@ -45,83 +49,57 @@ with tab1:
         for j in range(len(selected_options[i])):
             with cols[j]:
                 if j == 1:
-                    selected_options[i][j] = st.selectbox(f'Row {i} & Column {j + 1}', middle_charts)
+                    selected_options[i][j] = st.selectbox(f'Row {i} & Column {j + 1}', MIDDLE_CHARTS)
                 elif not symmetrical:
-                        selected_options[i][j] = st.selectbox(f'Row {i} & Column {j + 1}', side_charts)
+                        selected_options[i][j] = st.selectbox(f'Row {i} & Column {j + 1}', SIDE_CHARTS)
                 elif j ==0:
-                    selected_options[i][0] = st.selectbox(f'Row {i} & Columns 1, 3', side_charts)
+                    selected_options[i][0] = st.selectbox(f'Row {i} & Columns 1, 3', SIDE_CHARTS)
                     selected_options[i][2] = selected_options[i][0]
 
     st.markdown('---')
 
 with tab2: 
     pass
-height_ratios = [1] + [2 for _ in range(n_rows-1)]
-fig_height = 10 + 5 * (n_rows - 2)
-axes = [[None for _ in range(3)] for _ in range(n_rows)]
-
-
-fig = plt.figure(figsize=(25, fig_height), constrained_layout=True)
-fig.patch.set_facecolor('#0e1117')
-gs = fig.add_gridspec(nrows=n_rows, ncols=3, height_ratios=height_ratios, width_ratios=[1, 1, 1])
-
-for i in range(len(axes)):
-    for j in range(len(axes[i])):
-        axes[i][j] = fig.add_subplot(gs[i,j])
-        axes[i][j].patch.set_facecolor('#0e1117') 
-        axes[i][j].axis('off')
-
-
-axes[0][0].imshow(Image.open(f'./federations/{home_team}.png'))
-axes[0][2].imshow(Image.open(f'./federations/{away_team}.png'))
-
-home_team_text = axes[0][1].text(0.2, 0.4, home_team, fontsize=30, ha='center', fontfamily="Monospace", fontweight='bold', color='white')
-home_team_text.set_bbox(dict(facecolor=country_colors[home_team], alpha=0.5, edgecolor='white', boxstyle='round'))
-away_team_text = axes[0][1].text(0.8, 0.4, away_team, fontsize=30, ha='center', fontfamily="Monospace", fontweight='bold', color='white')
-away_team_text.set_bbox(dict(facecolor=country_colors[away_team], alpha=0.5, edgecolor='white', boxstyle='round'))
-score_text = axes[0][1].text(
-    0.5,
-    0,
-    f'{match_data.home_score} - {match_data.away_score}',
-    fontsize=40,
-    ha='center',
-    fontfamily="Monospace",
-    fontweight='bold',
-    color='white'
-)
+# imported only here so the menus above show up before the plotting stack has loaded
+from render import render_dashboard, export_dashboard, EXPORT_FORMATS, EXPORT_DPIS, EXPORT_DPI
+profiler = DashboardProfile(match_id, memory=profile_memory) if profiling else None
+dashboard = render_dashboard(match_id, home_team, away_team, match_data.home_score, match_data.away_score, selected_options,
+                             profiler=profiler)
+st.image(dashboard, width='stretch')
 
+##################################################################
+if profiling:
+    st.sidebar.markdown('### Profile')
+    st.sidebar.dataframe(profiler.table(), hide_index=True)
+    profiler.write(PROFILE_LOG)
 
-for i in range(1, len(axes)):
-    for j in range(len(axes[i])):
-        if selected_options[i][j] != 'None':
-            if j == 1:
-                viz_dict[selected_options[i][j]](match_id, home_team, away_team, axes[i][j])
-                if selected_options[i][j] == 'xG Flow':
-                    axes[i][j].set_xlabel('Minute',fontname='Monospace',color='white',fontsize=16)
-                    axes[i][j].set_ylabel('xG',fontname='Monospace',color='white',fontsize=16)
-            elif j == 0:
-                viz_dict[selected_options[i][j]](match_id, home_team, axes[i][j])
-            elif j == 2:
-                viz_dict[selected_options[i][j]](match_id, away_team, axes[i][j], inverse=True)
+# the preview above is drawn at screen resolution, the download at the one picked here
+export_format = st.sidebar.selectbox('Format', list(EXPORT_FORMATS))
+export_dpi = st.sidebar.select_slider('DPI', EXPORT_DPIS, value=EXPORT_DPI)
+extension, mime = EXPORT_FORMATS[export_format]
 
-st.pyplot(fig)
 
-##################################################################
-import io
-buf = io.BytesIO()
-fig.savefig(buf, format='png')
-buf.seek(0)
+def export():
+    # runs only when the button is clicked, so reruns no longer pay for encoding the file;
+    # when profiling it is logged on its own, the sidebar table is long gone by then
+    export_profiler = DashboardProfile(match_id, memory=profile_memory) if profiling else None
+    data = export_dashboard(match_id, home_team, away_team, match_data.home_score, match_data.away_score,
+                            selected_options, export_format, export_dpi, profiler=export_profiler)
+    if profiling:
+        export_profiler.write(PROFILE_LOG)
+    return data
+
 
 st.sidebar.download_button(
     label="Download Your Dashboard",
-    data=buf,
-    file_name=f"{home_team}_vs_{away_team}_dashboard.png",
-    mime="image/png"
+    data=export,
+    file_name=f"{home_team}_vs_{away_team}_dashboard.{extension}",
+    mime=mime
 )
 
 st.markdown('---')
 st.image('https://raw.githubusercontent.com/AKapich/WorldCup_App/main/app/sb_icon.png',
-          caption='App made by Aleks Kapich. Data powered by StatsBomb', use_column_width=True)
+          caption='App made by Aleks Kapich. Data powered by StatsBomb', width='stretch')
 
 st.sidebar.markdown('---')
 col1, col2 = st.columns(2)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+# per event type, where its end location, outcome and type specific attributes live in the flat frame
+END_LOCATION_COLUMNS = {'Pass': 'pass_end_location', 'Carry': 'carry_end_location', 'Shot': 'shot_end_location'}
+OUTCOME_COLUMNS = {'Pass': 'pass_outcome', 'Shot': 'shot_outcome'}
+# bump whenever the compact frame below changes so that frames stored by the match cache are rebuilt
+COMPACT_VERSION = 1
+# raw columns the panels read besides the typed attributes, the other hundred or so are dropped; all of
+# them are in every compact frame, empty when no event of the match has that attribute
+EVENT_COLUMNS = ['type', 'team', 'player', 'period', 'minute', 'second', 'tactics', 'substitution_outcome',
+                 'substitution_replacement', 'foul_committed_card', 'bad_behaviour_card', 'player_off_permanent']
+# repeated strings, stored once per match as categories (group them with observed=True)
+CATEGORY_COLUMNS = ['type', 'team', 'player', 'recipient', 'outcome', 'substitution_outcome', 'substitution_replacement',
+                    'foul_committed_card', 'bad_behaviour_card']
+
+
+def _coordinates(values):
+    # [x, y(, z)] lists -> two float32 arrays, NaN where there is no location
+    xy = np.full((len(values), 2), np.nan, dtype=np.float32)
+    present = np.fromiter((isinstance(v, (list, tuple, np.ndarray)) for v in values), dtype=bool, count=len(values))
+    if present.any():
+        xy[present] = [v[:2] for v in values[present]]
+    return xy[:, 0], xy[:, 1]
+
+
+def _column(events, name, dtype):
+    if name not in events.columns:
+        return np.full(len(events), np.nan, dtype=dtype)
+    return events[name].to_numpy(dtype=dtype, na_value=np.nan)
+
+
+def extract_attributes(events):
+    # typed columns read by the panels, built once per match instead of walking
+    # the location lists and attribute columns row by row in every panel
+    types = events['type'].to_numpy()
+    # a frame of unlocated events only (lineups, half starts...) has no location column at all
+    locations = events['location'].to_numpy() if 'location' in events.columns else np.full(len(events), None, dtype=object)
+    x, y = _coordinates(locations)
+    end_x = np.full(len(events), np.nan, dtype=np.float32)
+    end_y = np.full(len(events), np.nan, dtype=np.float32)
+    outcome = np.full(len(events), None, dtype=object)
+
+    for ev_type, column in END_LOCATION_COLUMNS.items():
+        rows = np.flatnonzero(types == ev_type)
+        if len(rows) and column in events.columns:
+            end_x[rows], end_y[rows] = _coordinates(events[column].to_numpy()[rows])
+    for ev_type, column in OUTCOME_COLUMNS.items():
+        rows = np.flatnonzero(types == ev_type)
+        if len(rows) and column in events.columns:
+            outcome[rows] = events[column].to_numpy()[rows]
+
+    recipient = events['pass_recipient'] if 'pass_recipient' in events.columns else None
+    return pd.DataFrame({
+        'x': x,
+        'y': y,
+        'end_x': end_x,
+        'end_y': end_y,
+        'angle': _column(events, 'pass_angle', np.float32),
+        'length': _column(events, 'pass_length', np.float32),
+        'recipient': recipient.to_numpy() if recipient is not None else np.full(len(events), None, dtype=object),
+        'xg': _column(events, 'shot_statsbomb_xg', np.float32),
+        'outcome': outcome,
+    }, index=events.index)
+
+
+def compact_events(events):
+    # the flat statsbombpy frame reduced to what the panels use: float32 coordinates instead of
+    # location lists, categorical strings and small int clock columns
+    compact = pd.concat([events.reindex(columns=EVENT_COLUMNS), extract_attributes(events)], axis=1)
+    for col in CATEGORY_COLUMNS:
+        # object first, so that a column no event has is the same empty category as read back from disk
+        compact[col] = compact[col].astype(object).astype('category')
+    compact['period'] = compact['period'].astype(np.int8)
+    compact['minute'] = compact['minute'].astype(np.int16)
+    compact['second'] = compact['second'].astype(np.int8)
+    compact['player_off_permanent'] = compact['player_off_permanent'].eq(True)
+    return compact.reset_index(drop=True)
@@ -1,30 +1,30 @@
-from statsbombpy import sb
 import pandas as pd
-import numpy as np
-import streamlit as st
+from event_store import match_catalog
+from lineups import starting_XI
+from match_bundle import match_cache
+from momentum import batch_momentum
 
 # Data from Euro 2024
-matches = sb.matches(competition_id=55, season_id=282)
-match_dict = {home+' - '+away: match_id
-                 for match_id, home, away
-                 in zip(matches['match_id'], matches['home_team'], matches['away_team'])}
+COMPETITION_ID, SEASON_ID = 55, 282
 
 
-@st.cache_data(ttl=600, show_spinner=False)
-def fetch_match_data(match_id):
-    return sb.events(match_id=match_id)
+def get_matches():
+    return match_catalog(competition_id=COMPETITION_ID, season_id=SEASON_ID)
+
 
-@st.cache_data(ttl=600, show_spinner=False)
-def fetch_match_pass_data(match_id):
-    return sb.events(match_id=match_id, split=True, flatten_attrs=False)["passes"]
+def get_match_dict():
+    matches = get_matches()
+    return {home+' - '+away: match_id
+            for match_id, home, away
+            in zip(matches['match_id'], matches['home_team'], matches['away_team'])}
 
-@st.cache_data(ttl=600, show_spinner=False)
-def fetch_match_shot_data(match_id):
-    return sb.events(match_id=match_id, split=True, flatten_attrs=False)["shots"]
 
-@st.cache_data(ttl=600, show_spinner=False)
-def fetch_match_split_data(match_id):
-    return sb.events(match_id=match_id, split=True, flatten_attrs=False)
+def fetch_match_bundle(match_id):
+    # process-wide and bounded by EURO_MATCH_CACHE_MB instead of a ttl, see match_bundle.MatchCache
+    return match_cache.bundle(match_id)
+
+def fetch_match_data(match_id):
+    return fetch_match_bundle(match_id).events
 
 
 country_colors = {
@@ -56,13 +56,18 @@ country_colors = {
 
 
 def get_starting_XI(match_id, team):
-    events = fetch_match_data(match_id)
-    events = events[events["team"]==team]
-    startingXI = [p['player']['name'] for p in events[events['type']=='Starting XI']['tactics'].values[0]['lineup']]
-    early_replacements = events[events['substitution_replacement'].notna()][events['minute']<30]
-    early_replacements_dict = dict(zip(early_replacements['player'], early_replacements['substitution_replacement']))
-    startingXI = [p if p not in early_replacements_dict.keys() else early_replacements_dict[p] for p in startingXI]
-    return startingXI
+    # starters with the ones replaced in the first half hour swapped for their substitutes,
+    # read from the lineup table built once per match
+    return starting_XI(fetch_match_bundle(match_id).lineups, team)
+
+
+def get_momentum_curves(match_ids, **kwargs):
+    # xT momentum of many matches in a single pass, keyed by match_id
+    match_ids = list(match_ids)
+    teams = get_matches().set_index('match_id').loc[match_ids, ['home_team', 'away_team']]
+    curves = batch_momentum([(fetch_match_bundle(match_id).xT, home, away)
+                             for match_id, (home, away) in zip(match_ids, teams.values)], **kwargs)
+    return dict(zip(match_ids, curves))
 
 
 def lighten_hex_color(hex_color, percentage):
@@ -84,63 +89,20 @@ def darken_hex_color(hex_color, percentage):
 
 
 def get_players_xT(match_id):
-    xT = pd.read_csv("https://raw.githubusercontent.com/AKapich/WorldCup_App/main/app/xT_Grid.csv", header=None)
-    xT = np.array(xT)
-    xT_rows, xT_cols = xT.shape 
-    events = sb.events(match_id=match_id)
-
-    players = events[['player', 'team']].drop_duplicates().dropna()
-
-    def get_xT(type):
-        df = events[events['type']==type]
-        df['start_x'], df['start_y'] = zip(*df['location'])
-        df['end_x'], df['end_y'] = zip(*df[f'{type.lower()}_end_location'])
-
-        df[f'start_{type.lower()}_x_bin'] = pd.cut(df['start_x'], bins=xT_cols, labels=False)
-        df[f'start_{type.lower()}_y_bin'] = pd.cut(df['start_y'], bins=xT_rows, labels=False)
-        df[f'end_{type.lower()}_x_bin'] = pd.cut(df['end_x'], bins=xT_cols, labels=False)
-        df[f'end_{type.lower()}_y_bin'] = pd.cut(df['end_x'], bins=xT_rows, labels=False)
-        df['start_zone_value'] = df[[f'start_{type.lower()}_x_bin', f'start_{type.lower()}_y_bin']].apply(lambda z: xT[z[1]][z[0]], axis=1)
-        df['end_zone_value'] = df[[f'end_{type.lower()}_x_bin', f'end_{type.lower()}_y_bin']].apply(lambda z: xT[z[1]][z[0]], axis=1)
-        df[f'{type.lower()}_xT'] = df['end_zone_value']-df['start_zone_value']
-
-        return df[['player', f'{type.lower()}_xT']]
-
-    for type in ['Pass', 'Carry']:
-        xT_df = get_xT(type)
-        xT_df = xT_df.groupby('player').sum()
-        players = pd.merge(players, xT_df, on='player', how='left')
-
-    players = players.fillna(0)
+    bundle = fetch_match_bundle(match_id)
+
+    players = bundle.events[['player', 'team']].drop_duplicates().dropna()
+    xT_df = bundle.xT.pivot_table(index='player', columns='type', values='xT', aggfunc='sum', observed=True)
+    xT_df = xT_df.rename(columns={'Pass': 'pass_xT', 'Carry': 'carry_xT'})
+    players = pd.merge(players, xT_df[['pass_xT', 'carry_xT']], left_on='player', right_index=True, how='left')
+
+    players[['pass_xT', 'carry_xT']] = players[['pass_xT', 'carry_xT']].fillna(0)
     players['total_xT'] = players['pass_xT'] + players['carry_xT']
     players = players.sort_values('total_xT', ascending=False)
 
     return players
 
 
-def get_xT(events, type, momentum=False):
-    xT = pd.read_csv("https://raw.githubusercontent.com/AKapich/WorldCup_App/main/app/xT_Grid.csv", header=None)
-    xT = np.array(xT)
-    xT_rows, xT_cols = xT.shape 
-
-    df = events[events['type']==type]
-    df['start_x'], df['start_y'] = zip(*df['location'])
-    df['end_x'], df['end_y'] = zip(*df[f'{type.lower()}_end_location'])
-
-    df[f'start_x_bin'] = pd.cut(df['start_x'], bins=xT_cols, labels=False)
-    df[f'start_y_bin'] = pd.cut(df['start_y'], bins=xT_rows, labels=False)
-    df[f'end_x_bin'] = pd.cut(df['end_x'], bins=xT_cols, labels=False)
-    df[f'end_y_bin'] = pd.cut(df['end_x'], bins=xT_rows, labels=False)
-    df['start_zone_value'] = df[[f'start_x_bin', f'start_y_bin']].apply(lambda z: xT[z[1]][z[0]], axis=1)
-    df['end_zone_value'] = df[[f'end_x_bin', f'end_y_bin']].apply(lambda z: xT[z[1]][z[0]], axis=1)
-    df['xT'] = df['end_zone_value']-df['start_zone_value']
-    
-    if not momentum:
-        return df[['xT', 'start_x', 'start_y', 'end_x', 'end_y', 'type']]
-    else:
-        return df[['xT', 'minute', 'second', 'team', 'type']]
-
-
 annotation_fix_dict = {
     'Mikel Merino Zazón': 'Mikel Merino',
     'Ayoze Pérez Gutiérrez': 'Ayoze Pérez',
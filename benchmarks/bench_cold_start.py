@@ -0,0 +1,53 @@
+# Time until the match selectbox can be filled, each run in a fresh interpreter:
+#   eager   - the old behaviour, fetching the whole match list while auxiliary is imported
+#   cold    - lazy catalog on a first run, nothing stored locally yet
+#   warm    - lazy catalog read back from the local store
+#
+#   python benchmarks/bench_cold_start.py [--repeat 5]
+# set EURO_OFFLINE_DATA to time against a local copy of the open data instead of GitHub
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# code timed once auxiliary is imported; the import itself is the same for all of them
+SCRIPTS = {
+    'eager': 'from event_store import load_matches; load_matches(55, 282)',
+    'cold': 'auxiliary.get_match_dict()',
+    'warm': 'auxiliary.get_match_dict()',
+}
+
+
+def run(script, store):
+    # returns (import seconds, match list seconds)
+    timed = ('import time; start = time.perf_counter(); import auxiliary; imported = time.perf_counter(); '
+             f'{script}; print(imported - start, time.perf_counter() - imported)')
+    env = dict(os.environ, EURO_EVENT_STORE=store)
+    out = subprocess.run([sys.executable, '-c', timed], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return tuple(map(float, out.stdout.strip().splitlines()[-1].split()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    timings = {name: [] for name in SCRIPTS}
+    for _ in range(args.repeat):
+        store = tempfile.mkdtemp()
+        try:
+            for name, script in SCRIPTS.items():
+                # eager and cold start from an empty store, cold leaves the catalog behind for warm
+                timings[name].append(run(script, store))
+        finally:
+            shutil.rmtree(store)
+
+    imports = [t[0] for values in timings.values() for t in values]
+    print(f'import auxiliary: {min(imports) * 1000:8.1f} ms')
+    for name, values in timings.items():
+        best = min(t[1] for t in values)
+        print(f'{name + ":":17} {best * 1000:8.1f} ms until the match list is ready (best of {args.repeat})')
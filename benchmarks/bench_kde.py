@@ -0,0 +1,97 @@
+# Compares the seaborn.kdeplot call pass_heatmap used with the binned/FFT KDE in kde.py, for one team's
+# passes in a match, a team's passes over the whole tournament and every pass of the tournament.
+#
+#   python benchmarks/bench_kde.py --data <open-data dir> [--repeat 3] [--cell 0.5]
+#
+# seaborn / binned ms - estimating the density, drawing the filled contours onto a pitch and rasterizing it
+# estimate ms         - the binned density on the grid and its contour levels only
+# level_err           - largest difference of the contour levels from scipy's gaussian_kde on the same grid,
+#                       relative to the peak density
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', required=True, help='directory with StatsBomb open-data style fixtures')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cell', type=float, default=None, help='grid cell side in yards (kde.CELL by default)')
+    args = parser.parse_args()
+
+    os.environ['EURO_OFFLINE_DATA'] = os.path.abspath(args.data)
+    os.environ.setdefault('EURO_EVENT_STORE', tempfile.mkdtemp(prefix='bench_kde_'))
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from mplsoccer.pitch import Pitch
+    from scipy.stats import gaussian_kde
+
+    import kde
+    from auxiliary import fetch_match_bundle, get_matches
+    from tournament import team_match_ids
+    warnings.filterwarnings('ignore')
+    cell = args.cell or kde.CELL
+
+    matches = get_matches().sort_values(['match_date', 'kick_off'])
+    last = matches.iloc[-1]
+    team = last['home_team']
+    passes = {match_id: fetch_match_bundle(match_id).passes for match_id in matches['match_id']}
+    team_passes = [passes[match_id][passes[match_id]['team']==team] for match_id in team_match_ids(last['match_id'], team)]
+    volumes = {
+        'one match, one team': team_passes[-1],
+        f'tournament, one team ({len(team_passes)} matches)': np.concatenate([p[['x', 'y']].to_numpy() for p in team_passes]),
+        f'tournament, all passes ({len(passes)} matches)': np.concatenate([p[['x', 'y']].to_numpy() for p in passes.values()]),
+    }
+
+    def panel(draw):
+        fig, ax = plt.subplots(figsize=(8, 6))
+        Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc').draw(ax=ax)
+        draw(ax)
+        ax.set_xlim(0, 120)
+        ax.set_ylim(80, 0)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def estimate(x, y):
+        xs, ys, density = kde.binned_kde(x, y, cell=cell)
+        return xs, ys, density, kde.iso_proportion_levels(density)
+
+    print(f"{'':40} {'passes':>7} {'seaborn ms':>11} {'binned ms':>10} {'panel speedup':>14} "
+          f"{'estimate ms':>12} {'level_err':>10}")
+    for name, points in volumes.items():
+        points = np.asarray(points[['x', 'y']] if hasattr(points, 'columns') else points, dtype=np.float64)
+        x, y = points[:, 0], points[:, 1]
+        seaborn_s = best_of(lambda: panel(lambda ax: sns.kdeplot(x=x, y=y, fill=True, thresh=kde.THRESH, alpha=.6,
+                                                                 levels=kde.LEVELS, cmap='Blues', ax=ax)), args.repeat)
+
+        def binned(ax):
+            xs, ys, density, levels = estimate(x, y)
+            ax.contourf(xs, ys, density, levels=levels, alpha=.6, cmap='Blues')
+
+        binned_s = best_of(lambda: panel(binned), args.repeat)
+        estimate_s = best_of(lambda: estimate(x, y), args.repeat)
+
+        xs, ys, density, levels = estimate(x, y)
+        xx, yy = np.meshgrid(xs, ys)
+        exact = gaussian_kde(points.T)(np.stack([xx.ravel(), yy.ravel()])).reshape(xx.shape)
+        level_err = np.abs(levels - kde.iso_proportion_levels(exact)).max() / exact.max()
+        print(f'{name:40} {len(x):7} {seaborn_s * 1000:11.1f} {binned_s * 1000:10.1f} {seaborn_s / binned_s:13.1f}x '
+              f'{estimate_s * 1000:12.1f} {level_err:10.4f}')
@@ -0,0 +1,52 @@
+# Memory held per match: the flat statsbombpy frame the panels used to share versus the compact
+# frame MatchBundle keeps (used columns only, categorical strings, float32 coordinates, small ints).
+#
+#   python benchmarks/bench_memory.py --data <open-data dir> [--matches 51] [--out memory.json]
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def frame_bytes(df):
+    # deep in-memory size and the size of the pickle streamlit's st.cache_data used to make on every hit
+    return int(df.memory_usage(deep=True).sum()), len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', required=True, help='directory with StatsBomb open-data style fixtures')
+    parser.add_argument('--matches', type=int, default=51)
+    parser.add_argument('--out')
+    args = parser.parse_args()
+
+    os.environ['EURO_OFFLINE_DATA'] = os.path.abspath(args.data)
+    os.environ.setdefault('EURO_EVENT_STORE', tempfile.mkdtemp(prefix='bench_memory_'))
+    from auxiliary import get_matches
+    from event_store import load_events
+    from match_bundle import MatchBundle
+
+    rows = []
+    for match_id in sorted(get_matches()['match_id'])[:args.matches]:
+        events = load_events(match_id)
+        compact = MatchBundle(match_id, events).events
+        (flat_mem, flat_pickle), (compact_mem, compact_pickle) = frame_bytes(events), frame_bytes(compact)
+        rows.append({'match_id': int(match_id), 'events': len(events),
+                     'flat_columns': events.shape[1], 'compact_columns': compact.shape[1],
+                     'flat_bytes': flat_mem, 'compact_bytes': compact_mem,
+                     'flat_pickle_bytes': flat_pickle, 'compact_pickle_bytes': compact_pickle})
+        row = rows[-1]
+        print(f"{row['match_id']:>10} {row['events']:>6} events  {row['flat_columns']:>4} -> {row['compact_columns']:>3} columns  "
+              f"{flat_mem / 2**20:7.2f} -> {compact_mem / 2**20:6.2f} MiB  ({1 - compact_mem / flat_mem:.0%} saved)")
+
+    flat = sum(row['flat_bytes'] for row in rows)
+    compact = sum(row['compact_bytes'] for row in rows)
+    print(f'{len(rows)} matches: {flat / 2**20:.1f} -> {compact / 2**20:.1f} MiB in memory, '
+          f'{(flat - compact) / len(rows) / 2**20:.2f} MiB saved per match ({1 - compact / flat:.0%})')
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(rows, f, indent=2)
@@ -0,0 +1,180 @@
+# Times every panel in get_viz.viz_dict and complete 3-5 row dashboards on local match fixtures,
+# and writes the results as JSON so that two runs can be compared.
+#
+#   python benchmarks/bench_viz.py --data <open-data dir> [--matches 3] [--repeat 3] [--out bench.json]
+#   python benchmarks/bench_viz.py --compare before.json after.json [--threshold 0.1]
+#
+# <open-data dir> is laid out like StatsBomb's open-data repository (`python synthetic.py generate <dir>`).
+# Per panel and match:
+#   cold_s     - match not in memory, events read back from the Parquet store
+#   warm_s     - match already parsed and cached, only preparing and drawing the panel
+#   peak_kib   - tracemalloc peak of a cold run
+#   fetches    - event_store.fetch_counts of a cold run (network / offline / disk)
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# rows of a symmetrical layout; the first n of them make the n row dashboard
+LAYOUT_ROWS = [['Passing Network', 'Overview'], ['Shot xG', 'xG Flow'], ['xT Heatmap', 'xT Momentum'],
+               ['Pass Heatmap', 'Voronoi Diagram'], ['Passing Sonars', 'Shot Types']]
+
+
+def best_of(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_suite(match_ids, repeat):
+    # imported here so EURO_OFFLINE_DATA / EURO_EVENT_STORE are set first
+    import event_store
+    from auxiliary import get_matches
+    from match_bundle import match_cache
+    from get_viz import viz_dict
+    from layout import MIDDLE_CHARTS, build_layout
+    from render import PREVIEW_DPI, TileCache, _figure, dashboard_geometry, draw_panel, render_dashboard
+    from tournament import partials_cache
+
+    matches = get_matches().set_index('match_id')
+    # fill the Parquet store once, every cold run afterwards reads from disk
+    for match_id in match_ids:
+        event_store.load_events(match_id)
+
+    def draw(viz_name, match_id):
+        home, away = matches.loc[match_id, ['home_team', 'away_team']]
+        column = 1 if viz_name in MIDDLE_CHARTS else 0
+        fig = _figure((800, 600), PREVIEW_DPI)
+        ax = fig.add_subplot()
+        draw_panel(viz_name, match_id, home, away, column, ax)
+        fig.canvas.draw()
+
+    def clear_caches():
+        # the tournament partials are kept apart from the matches, cold runs read them back from the store
+        match_cache.clear()
+        partials_cache.clear()
+
+    def cold_run(func):
+        clear_caches()
+        before = dict(event_store.fetch_counts)
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, {k: v - before[k] for k, v in event_store.fetch_counts.items()}
+
+    panels = {}
+    for viz_name in viz_dict:
+        for match_id in match_ids:
+            func = lambda: draw(viz_name, match_id)
+            peak, fetches = cold_run(func)
+            panels[f'{viz_name} / {match_id}'] = {
+                'cold_s': best_of(func, repeat, setup=clear_caches),
+                'warm_s': best_of(func, repeat),
+                'peak_kib': peak / 1024,
+                'fetches': fetches,
+            }
+            print(f'{viz_name:25} {match_id:>10} {panels[f"{viz_name} / {match_id}"]["warm_s"] * 1000:9.1f} ms', flush=True)
+
+    layouts = {}
+    for n_rows in (3, 4, 5):
+        selected_options = build_layout(LAYOUT_ROWS[:n_rows], symmetrical=True)
+        for match_id in match_ids:
+            row = matches.loc[match_id]
+            # an empty tile cache so every panel is drawn, in this process
+            func = lambda: render_dashboard(match_id, row.home_team, row.away_team, row.home_score, row.away_score,
+                                            selected_options, cache=TileCache(0), workers=0)
+            peak, fetches = cold_run(func)
+            layouts[f'{n_rows} rows / {match_id}'] = {
+                'cold_s': best_of(func, repeat, setup=clear_caches),
+                'warm_s': best_of(func, repeat),
+                'peak_kib': peak / 1024,
+                'fetches': fetches,
+                'size_px': [sum(size) for size in dashboard_geometry(n_rows + 1)[::-1]],
+            }
+            print(f'{n_rows} rows {match_id:>30} {layouts[f"{n_rows} rows / {match_id}"]["warm_s"] * 1000:9.1f} ms', flush=True)
+    return panels, layouts
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path, after_path, threshold):
+    # relative change of every timing and memory figure present in both runs
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    regressions = 0
+    for section in ('panels', 'layouts'):
+        for name in sorted(before[section].keys() & after[section].keys()):
+            for metric in ('cold_s', 'warm_s', 'peak_kib'):
+                old, new = before[section][name][metric], after[section][name][metric]
+                change = (new - old) / old if old else 0.0
+                flag = ''
+                if change > threshold:
+                    flag = '  <-- slower' if metric != 'peak_kib' else '  <-- more memory'
+                    regressions += 1
+                print(f'{name:45} {metric:9} {old:12.4f} {new:12.4f} {change:+8.1%}{flag}')
+            if before[section][name]['fetches'] != after[section][name]['fetches']:
+                regressions += 1
+                print(f'{name:45} fetches   {before[section][name]["fetches"]} -> {after[section][name]["fetches"]}  <-- changed')
+    print(f'{regressions} regressions above {threshold:.0%}')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', help='directory with StatsBomb open-data style fixtures')
+    parser.add_argument('--matches', type=int, default=3, help='number of fixture matches, lowest ids first')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default='bench_viz.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    if not args.data:
+        parser.error('--data is required unless --compare is given')
+
+    os.environ['EURO_OFFLINE_DATA'] = os.path.abspath(args.data)
+    # a throwaway store and catalog so earlier runs cannot warm anything up
+    os.environ['EURO_EVENT_STORE'] = tempfile.mkdtemp(prefix='bench_viz_')
+
+    try:
+        from auxiliary import get_matches
+        match_ids = sorted(get_matches()['match_id'])[:args.matches]
+        panels, layouts = run_suite(match_ids, args.repeat)
+    finally:
+        shutil.rmtree(os.environ['EURO_EVENT_STORE'])
+
+    result = {
+        'meta': {'commit': git_commit(), 'python': platform.python_version(), 'machine': platform.machine(),
+                 'cpus': os.cpu_count(), 'matches': [int(m) for m in match_ids], 'repeat': args.repeat},
+        'panels': panels,
+        'layouts': layouts,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(result, f, indent=2, default=int)
+    print(f'written to {args.out}')
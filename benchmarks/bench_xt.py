@@ -0,0 +1,63 @@
+# Compares the old pandas xT lookup (pd.cut + row-wise apply) with the vectorized engine in xt.py
+# on a tournament's worth of passes and carries.
+#
+#   python benchmarks/bench_xt.py [--actions 92000] [--repeat 3]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from xt import XT_GRID_PATH, load_xT_grid, action_xT
+
+
+def legacy_xT(df):
+    # the implementation previously found in auxiliary.get_xT, minus the per-call HTTP download of the grid
+    xT = np.array(pd.read_csv(XT_GRID_PATH, header=None))
+    xT_rows, xT_cols = xT.shape
+    df = df.copy()
+    df['start_x_bin'] = pd.cut(df['start_x'], bins=xT_cols, labels=False)
+    df['start_y_bin'] = pd.cut(df['start_y'], bins=xT_rows, labels=False)
+    df['end_x_bin'] = pd.cut(df['end_x'], bins=xT_cols, labels=False)
+    df['end_y_bin'] = pd.cut(df['end_x'], bins=xT_rows, labels=False)
+    df['start_zone_value'] = df[['start_x_bin', 'start_y_bin']].apply(lambda z: xT[z.iloc[1]][z.iloc[0]], axis=1)
+    df['end_zone_value'] = df[['end_x_bin', 'end_y_bin']].apply(lambda z: xT[z.iloc[1]][z.iloc[0]], axis=1)
+    return df['end_zone_value'] - df['start_zone_value']
+
+
+def vectorized_xT(df):
+    return action_xT(df['start_x'].to_numpy(), df['start_y'].to_numpy(), df['end_x'].to_numpy(), df['end_y'].to_numpy())
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    # 51 matches with roughly 1000 passes and 800 carries each
+    parser.add_argument('--actions', type=int, default=51 * 1800)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'start_x': rng.uniform(0, 120, args.actions), 'start_y': rng.uniform(0, 80, args.actions),
+        'end_x': rng.uniform(0, 120, args.actions), 'end_y': rng.uniform(0, 80, args.actions),
+    })
+    load_xT_grid()
+
+    legacy = best_of(legacy_xT, df, args.repeat)
+    vectorized = best_of(vectorized_xT, df, args.repeat)
+    print(f'actions:    {args.actions}')
+    print(f'legacy:     {legacy * 1000:10.1f} ms')
+    print(f'vectorized: {vectorized * 1000:10.1f} ms')
+    print(f'speedup:    {legacy / vectorized:10.1f}x')
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+
+POLICIES = ('lru', 'lfu')
+
+
+class BoundedCache:
+    # process-wide cache bounded by the total size of its values; evicts the least recently ('lru')
+    # or least frequently ('lfu', ties broken by recency) used entries once over max_bytes
+
+    def __init__(self, max_bytes, policy='lru', sizeof=lambda value: value.nbytes):
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown eviction policy {policy!r}, choose from {POLICIES}')
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()   # key -> value, least recently used first
+        self._sizes = {}
+        self._uses = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._uses[key] += 1
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._uses[key] = 1
+            self.nbytes += size
+            self._evict(keep=key)
+
+    def resize(self, key):
+        # values that grow after being cached (lazily computed parts) are measured again
+        with self._lock:
+            if key in self._entries:
+                size = self.sizeof(self._entries[key])
+                self.nbytes += size - self._sizes[key]
+                self._sizes[key] = size
+                self._evict(keep=key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._uses.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'nbytes': self.nbytes, 'max_bytes': self.max_bytes,
+                    'policy': self.policy, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.nbytes -= self._sizes.pop(key)
+        del self._uses[key]
+
+    def _victim(self, keep):
+        candidates = [key for key in self._entries if key != keep]
+        if not candidates:
+            return None
+        if self.policy == 'lru':
+            return candidates[0]
+        # min keeps the first of equal counts, which is the least recently used one
+        return min(candidates, key=self._uses.__getitem__)
+
+    def _evict(self, keep=None):
+        while self.nbytes > self.max_bytes:
+            key = self._victim(keep)
+            if key is None:
+                break
+            self._remove(key)
+            self.evictions += 1
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import logging
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Parquet files live here, one per match
+STORE_DIR = os.environ.get('EURO_EVENT_STORE',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.event_store'))
+# when set, events are read from a StatsBomb open-data style directory instead of the network:
+# <dir>/events/<match_id>.json and <dir>/matches/<competition_id>/<season_id>.json
+OFFLINE_DIR = os.environ.get('EURO_OFFLINE_DATA')
+# when set, statsbombpy downloads open data from this server instead of GitHub, e.g. the stand-in
+# started by `python synthetic.py serve`; OFFLINE_DIR takes precedence
+OPEN_DATA_URL = os.environ.get('EURO_OPEN_DATA_URL')
+OPEN_DATA_FILES = {
+    'competitions': 'competitions.json',
+    'matches': 'matches/{competition_id}/{season_id}.json',
+    'lineups': 'lineups/{match_id}.json',
+    'events': 'events/{match_id}.json',
+    'frames': 'three-sixty/{match_id}.json',
+}
+
+# a stored match catalog older than this (seconds) is refreshed in the background
+CATALOG_MAX_AGE = int(os.environ.get('EURO_CATALOG_MAX_AGE', 6 * 3600))
+
+# how many times each source has been hit, handy when benchmarking
+fetch_counts = {'network': 0, 'offline': 0, 'disk': 0}
+
+
+def _read_json(*parts):
+    with open(os.path.join(OFFLINE_DIR, *parts), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _statsbombpy():
+    # importing statsbombpy takes seconds (mostly inflect), and it is only needed when something
+    # actually has to be fetched, not when everything is served from the store
+    import statsbombpy.sb
+    if OPEN_DATA_URL:
+        statsbombpy.config.OPEN_DATA_PATHS.update(
+            {name: f"{OPEN_DATA_URL.rstrip('/')}/{path}" for name, path in OPEN_DATA_FILES.items()})
+    return statsbombpy
+
+
+def _raw_events(match_id):
+    # ids taken from the matches frame are numpy integers, which end up in every event
+    match_id = int(match_id)
+    statsbombpy = _statsbombpy()
+    if OFFLINE_DIR:
+        fetch_counts['offline'] += 1
+        return statsbombpy.entities.events(_read_json('events', f'{match_id}.json'), match_id)
+    fetch_counts['network'] += 1
+    creds = statsbombpy.config.DEFAULT_CREDS
+    if statsbombpy.api_client.has_auth(creds):
+        return statsbombpy.api_client.events(match_id, creds=creds)
+    return statsbombpy.public.events(match_id)
+
+
+def _flatten(raw):
+    # same steps as sb.events with flatten_attrs=True, flatten_event mutates the dicts so work on a fresh copy
+    raw = json.loads(json.dumps(raw))
+    events = _statsbombpy().helpers.filter_and_group_events(raw, {}, 'dataframe', True)
+    return pd.concat([pd.DataFrame(evs) for evs in events.values()], axis=0, ignore_index=True, sort=True)
+
+
+def flat_events(match_id, raw):
+    # the frame sb.events builds from a list of raw events, e.g. the ones that just came in on a live feed
+    return _flatten(_statsbombpy().entities.events(raw, int(match_id)))
+
+
+def _path(match_id):
+    return os.path.join(STORE_DIR, f'{match_id}.flat.parquet')
+
+
+def _nested_columns(df):
+    return [col for col in df.columns if df[col].dtype == object
+            and df[col].map(lambda v: isinstance(v, (list, dict))).any()]
+
+
+def _write(df, path, metadata={}):
+    # lists and dicts (locations, tactics, pass attributes...) are kept as JSON text
+    # so that they come back exactly as statsbombpy built them
+    json_cols = _nested_columns(df)
+    df = df.copy()
+    for col in json_cols:
+        df[col] = [json.dumps(v) if isinstance(v, (list, dict)) else None for v in df[col]]
+    table = pa.Table.from_pandas(df)
+    metadata = {'json_columns': json_cols, **metadata}
+    table = table.replace_schema_metadata({**table.schema.metadata,
+                                           **{k.encode(): json.dumps(v).encode() for k, v in metadata.items()}})
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    table = pq.read_table(path)
+    metadata = {k.decode(): json.loads(v) for k, v in table.schema.metadata.items() if k != b'pandas'}
+    df = table.to_pandas()
+    for col in metadata['json_columns']:
+        df[col] = [json.loads(v) if v is not None else None for v in df[col]]
+    return df, metadata
+
+
+def save_table(name, df, metadata={}):
+    # derived per-match tables (aggregates and the like) kept next to the events
+    _write(df, os.path.join(STORE_DIR, f'{name}.parquet'), metadata)
+
+
+def load_table(name):
+    # (df, metadata), or None when the table has not been saved yet
+    path = os.path.join(STORE_DIR, f'{name}.parquet')
+    if not os.path.exists(path):
+        return None
+    return _read(path)
+
+
+def load_events(match_id):
+    # equivalent of sb.events(match_id), downloaded and parsed once and then read back from disk
+    path = _path(match_id)
+    if os.path.exists(path):
+        fetch_counts['disk'] += 1
+        return _read(path)[0]
+
+    df = _flatten(_raw_events(match_id))
+    _write(df, path)
+    return df
+
+
+def load_matches(competition_id, season_id):
+    if not OFFLINE_DIR:
+        return _statsbombpy().sb.matches(competition_id=competition_id, season_id=season_id)
+
+    # mirrors the dataframe branch of sb.matches
+    matches = pd.DataFrame(_read_json('matches', str(competition_id), f'{season_id}.json'))
+    matches['competition'] = matches.competition.apply(lambda c: f"{c['country_name']} - {c['competition_name']}")
+    for col in ['season', 'home_team', 'away_team']:
+        matches[col] = matches[col].apply(lambda c: c[f'{col}_name'])
+    for col in ['competition_stage', 'stadium', 'referee']:
+        if col in matches.columns:
+            matches[col] = matches[col].apply(lambda x: x['name'] if isinstance(x, dict) else x)
+    if 'metadata' in matches.columns:
+        metadata = matches.pop('metadata')
+        for k in ['data_version', 'shot_fidelity_version', 'xy_fidelity_version']:
+            matches[k] = metadata.apply(lambda x: x.get(k) if isinstance(x, dict) else None)
+    return matches
+
+
+_catalogs = {}
+_refreshing = set()
+_catalog_lock = threading.Lock()
+
+
+def _catalog_path(competition_id, season_id):
+    return os.path.join(STORE_DIR, f'matches_{competition_id}_{season_id}.parquet')
+
+
+def _refresh_catalog(competition_id, season_id):
+    matches = load_matches(competition_id, season_id)
+    _write(matches, _catalog_path(competition_id, season_id))
+    _catalogs[competition_id, season_id] = matches
+    return matches
+
+
+def _refresh_in_background(competition_id, season_id):
+    key = (competition_id, season_id)
+    with _catalog_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _refresh_catalog(competition_id, season_id)
+        except Exception:
+            # keep serving the stored catalog, the next call tries again
+            logging.getLogger(__name__).warning('Refreshing the match catalog failed', exc_info=True)
+        finally:
+            _refreshing.discard(key)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def match_catalog(competition_id, season_id):
+    # served from memory or the local copy straight away; only the very first run waits for
+    # StatsBomb, later ones refresh a stale copy in the background
+    path = _catalog_path(competition_id, season_id)
+    if (competition_id, season_id) not in _catalogs:
+        if not os.path.exists(path):
+            return _refresh_catalog(competition_id, season_id)
+        _catalogs[competition_id, season_id] = _read(path)[0]
+    if not os.path.exists(path) or time.time() - os.path.getmtime(path) > CATALOG_MAX_AGE:
+        _refresh_in_background(competition_id, season_id)
+    return _catalogs[competition_id, season_id]
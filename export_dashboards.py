@@ -0,0 +1,97 @@
+# Renders the same dashboard layout for every Euro 2024 match without the Streamlit UI.
+#
+#   python export_dashboards.py --out dashboards/ --symmetrical \
+#       --row "Passing Network,Overview" --row "Shot xG,xG Flow" --row "xT Heatmap,xT Momentum"
+#   python export_dashboards.py --layout layout.json --out dashboards.zip --workers 4 [--format PDF --dpi 150]
+#
+# layout.json: {"symmetrical": false, "rows": [["Passing Network", "Overview", "Passing Network"], ...]}
+# every row is [left, middle, right], or [side, middle] with --symmetrical
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from auxiliary import get_matches
+from layout import build_layout
+from render import EXPORT_FORMATS, EXPORT_DPI, export_dashboard
+
+
+DEFAULT_LAYOUT = {'symmetrical': True,
+                  'rows': [['Passing Network', 'Overview'], ['Shot xG', 'xG Flow'], ['xT Heatmap', 'xT Momentum']]}
+
+
+def export_match(job):
+    # runs in a worker process; tiles are never reused across matches so nothing is cached
+    match_id, home_team, away_team, home_score, away_score, selected_options, format, dpi = job
+    start = time.perf_counter()
+    data = export_dashboard(match_id, home_team, away_team, home_score, away_score, selected_options,
+                            format, dpi, workers=0)
+    return match_id, data, time.perf_counter() - start
+
+
+def file_name(match_id, home_team, away_team, format='PNG'):
+    return f'{match_id}_{home_team}_vs_{away_team}_dashboard.{EXPORT_FORMATS[format][0]}'.replace(' ', '_')
+
+
+def export_dashboards(selected_options, out, workers=None, dpi=EXPORT_DPI, match_ids=None, format='PNG'):
+    # out is a directory, or a zip archive when it ends with .zip; returns {match_id: seconds}
+    matches = get_matches()
+    if match_ids:
+        matches = matches[matches['match_id'].isin(match_ids)]
+    jobs = {row.match_id: (row.match_id, row.home_team, row.away_team, row.home_score, row.away_score,
+                           selected_options, format, dpi) for row in matches.itertuples()}
+
+    archive = zipfile.ZipFile(out, 'w') if out.endswith('.zip') else None
+    if archive is None:
+        os.makedirs(out, exist_ok=True)
+    timings = {}
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(export_match, job) for job in jobs.values()]
+            for future in as_completed(futures):
+                match_id, data, seconds = future.result()
+                _, home_team, away_team = jobs[match_id][:3]
+                name = file_name(match_id, home_team, away_team, format)
+                # the workers only render, every file is written from here
+                if archive is not None:
+                    archive.writestr(name, data)
+                else:
+                    with open(os.path.join(out, name), 'wb') as f:
+                        f.write(data)
+                timings[match_id] = seconds
+                print(f'{home_team + " - " + away_team:40} {seconds:7.2f} s  ({len(timings)}/{len(jobs)})', flush=True)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    total = time.perf_counter() - start
+    print(f'{len(timings)} dashboards in {total:.1f} s, {sum(timings.values()) / max(len(timings), 1):.2f} s per match')
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render a dashboard for every Euro 2024 match')
+    parser.add_argument('--out', required=True, help='output directory, or a .zip archive')
+    parser.add_argument('--layout', help='JSON file with "rows" and optionally "symmetrical"')
+    parser.add_argument('--row', action='append', help='comma separated panel names, repeat for every row')
+    parser.add_argument('--symmetrical', action='store_true')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--dpi', type=int, default=EXPORT_DPI)
+    parser.add_argument('--format', type=str.upper, choices=list(EXPORT_FORMATS), default='PNG')
+    parser.add_argument('--match', type=int, action='append', help='only export these match ids')
+    args = parser.parse_args()
+
+    if args.layout:
+        with open(args.layout, encoding='utf-8') as f:
+            spec = json.load(f)
+    elif args.row:
+        spec = {'symmetrical': args.symmetrical, 'rows': [[name.strip() for name in row.split(',')] for row in args.row]}
+    else:
+        spec = DEFAULT_LAYOUT
+
+    selected_options = build_layout(spec['rows'], spec.get('symmetrical', False))
+    export_dashboards(selected_options, args.out, args.workers, args.dpi, args.match, args.format)
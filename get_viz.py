@@ -1,21 +1,24 @@
-from statsbombpy import sb
-from mplsoccer.pitch import Pitch, VerticalPitch
 from matplotlib.colors import LinearSegmentedColormap
 from matplotlib.lines import Line2D
 from matplotlib.colors import LinearSegmentedColormap
 import matplotlib.patches as pat
+from matplotlib.collections import LineCollection, PatchCollection, PolyCollection
+from matplotlib.colors import to_rgba
 import pandas as pd
 import numpy as np
-import seaborn as sns
-from scipy import stats
-from scipy.spatial import ConvexHull
 from scipy.ndimage import gaussian_filter1d
 
 import warnings
 warnings.filterwarnings("ignore")
 
-from auxiliary import country_colors, annotation_fix_dict, lighten_hex_color, darken_hex_color, get_players_xT, get_xT, get_starting_XI
-from auxiliary import fetch_match_data, fetch_match_pass_data, fetch_match_shot_data, fetch_match_split_data
+from auxiliary import country_colors, annotation_fix_dict, lighten_hex_color, darken_hex_color, get_players_xT, get_starting_XI
+from auxiliary import fetch_match_data, fetch_match_bundle
+from kde import binned_kde, iso_proportion_levels
+from momentum import momentum, WINDOW_SIZE, DECAY_RATE
+from pitches import draw_pitch
+from profiling import preparing
+from territories import territories, first_substitution, match_hulls
+from tournament import team_match_ids, tournament_grid, tournament_passing_network, tournament_shots
 
 
 
@@ -24,9 +27,9 @@ def overview(match_id, home_team, away_team, ax):
 
         def get_basic_data(team, events):
             shots = events[(events['type'] == 'Shot') & (events['team'] == team)]
-            xg = round(shots['shot_statsbomb_xg'].sum(), 2)
+            xg = round(shots['xg'].sum(), 2)
             shot_amt = (len(shots))
-            SoT = len(shots[~(shots['shot_outcome'].isin(['Blocked', 'Off T', 'Post', 'Wayward']))])
+            SoT = len(shots[~(shots['outcome'].isin(['Blocked', 'Off T', 'Post', 'Wayward']))])
             xg_per_shot = round(xg / shot_amt, 2)
             return [xg, str(shot_amt), str(SoT), xg_per_shot]
         
@@ -49,40 +52,17 @@ def overview(match_id, home_team, away_team, ax):
 
 
 def voronoi(match_id, home_team, away_team, ax):
-        df = fetch_match_data(match_id)
-
-        subs = df[df["substitution_outcome"].notna()]
-        min_threshold = min(subs["minute"])
-        sec_threshold = min(subs["second"])
-        df = df[(df["minute"]<min_threshold) | ((df["minute"]==min_threshold) & (df["second"]<sec_threshold))]
-        df = df[df["location"].notna()]
-        df['x'], df['y'] = zip(*df['location'])
-        # average location
-        df = df.groupby(['player', 'team']).agg({'x': ['mean'], 'y': ['mean']})
-        df.columns = ['x', 'y']
-        df=df.reset_index()
-        # the column responsible for voronoi division must be boolean
-        df['team_id'] = df['team']==home_team
-
-        # reverse the coords of one team
-        for i in range(len(df)):
-                if not (df['team_id'][i]):
-                        df['x'][i] = 120-df['x'][i]
-                        df['y'][i] = 80-df['y'][i]
-
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
-
-        pitch.voronoi(df.x, df.y, df.team)
-        team1,team2 = pitch.voronoi(df.x, df.y, df.team_id)
+        # until the first substitution, so each team has exactly its starting XI
+        df, team1, team2 = territories(match_id, home_team, end=first_substitution(match_id))
+
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
         pitch.polygon(team1, ax=ax, fc=country_colors[home_team], ec='white', lw=3, alpha=0.5)
         pitch.polygon(team2, ax=ax, fc=country_colors[away_team], ec='white', lw=3, alpha=0.5)
 
         # Plot players
+        pitch.scatter(df['x'], df['y'], ax=ax, color=[country_colors[team] for team in df['team']])
         for i in range(len(df['x'])):
-                pitch.scatter(df['x'][i],df['y'][i],ax=ax,color=country_colors[df['team'][i]])
-                        
                 if df['player'][i] not in annotation_fix_dict.keys():
                     annotation_text = df['player'][i].split(" ")[-1]
                 else:
@@ -97,20 +77,10 @@ def voronoi(match_id, home_team, away_team, ax):
 
 
 def pressure_heatmap(match_id, team, ax, inverse=False):
-        events = fetch_match_split_data(match_id)
-        press = events['pressures'].query(f"team=='{team}'")
-        press_x, press_y = zip(*press['location'])
-        if inverse:
-                press_x = [120 - x for x in press_x]
-                press_y = [80 - y for y in press_y]
-        press_df = pd.DataFrame({'x': press_x, 'y': press_y})
-
-        
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)
-        pitch.draw(ax=ax)
+        bin_statistic = fetch_match_bundle(match_id).grid(team, 'pressures', (8, 6), inverse)
 
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)
 
-        bin_statistic = pitch.bin_statistic(press_df.x, press_df.y, statistic='count', bins=(8, 6), normalize=False)
         pitch.heatmap(bin_statistic, edgecolor='#323b49', ax=ax, alpha=0.55,
                 cmap=LinearSegmentedColormap.from_list("custom_cmap", ["#f3f9ff", country_colors[team]], N=100))
 
@@ -127,26 +97,20 @@ def pressure_heatmap(match_id, team, ax, inverse=False):
 
 
 def passing_network(match_id, team, ax, inverse=False):
-        passes = fetch_match_pass_data(match_id)
+        passes = fetch_match_bundle(match_id).passes
         passes = passes[passes['team']==team]
-        passes["recipient"] = [passes["pass"][i]["recipient"]["name"]
-                        if list(passes.loc[i]["pass"].keys())[0]=="recipient"
-                        else None
-                        for i in passes.index]
         passes = passes[passes["recipient"].notna()]
 
         startingXI = get_starting_XI(match_id, team)
         passes = passes[passes['player'].isin(startingXI) & passes['recipient'].isin(startingXI)]
 
-        passes['x'], passes['y'] = zip(*passes['location'])
         if inverse:
-                passes['x'] = [120 - x for x in passes['x']]
-                passes['y'] = [80 - y for y in passes['y']]
-        average_location = passes.groupby('player').agg({'x': ['mean'], 'y': ['mean','count']})
+                passes['x'] = 120 - passes['x']
+                passes['y'] = 80 - passes['y']
+        average_location = passes.groupby('player', observed=True).agg({'x': ['mean'], 'y': ['mean','count']})
         average_location.columns = ['x', 'y', 'count']
 
-        passes_between = passes.groupby(['player', 'recipient']).id.count().reset_index()
-        passes_between = passes_between.rename(columns={'id': 'pass_count'})
+        passes_between = passes.groupby(['player', 'recipient'], observed=True).size().reset_index(name='pass_count')
 
         # 'average_location' index is in fact 'player' column, therefore below right_index=True (we merge by it)
         passes_between = passes_between.merge(average_location, left_on="player", right_index=True)
@@ -155,8 +119,7 @@ def passing_network(match_id, team, ax, inverse=False):
         passes_between = passes_between.loc[(passes_between['pass_count']>1)]
 
         
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
         pitch.arrows(passes_between.x, passes_between.y,
                         passes_between.x_end, passes_between.y_end,
@@ -185,12 +148,10 @@ def passing_network(match_id, team, ax, inverse=False):
 
 
 def progressive_passes(match_id, team, ax, inverse=False):
-        passes = fetch_match_pass_data(match_id)
+        passes = fetch_match_bundle(match_id).passes
         df = passes[passes.team==team]
         
-        df[['start_x', 'start_y']] = pd.DataFrame(df['location'].tolist(), index=df.index)
-        df["end_x"] = [df["pass"][i]['end_location'][0] for i in df.index]
-        df["end_y"] = [df["pass"][i]['end_location'][1] for i in df.index]
+        df = df.rename(columns={'x': 'start_x', 'y': 'start_y'})
 
         if not inverse:       
             df['beginning'] = np.sqrt(np.square(120-df['start_x'])+np.square(80-df['start_y']))
@@ -206,8 +167,7 @@ def progressive_passes(match_id, team, ax, inverse=False):
         # according to definiton pass is progressive if it brings the ball closer to the goal by at least 25%
         df['progressive'] = df['end'] < 0.75*df['beginning']
         
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
         df = df[df['progressive']==True]
         df.index = range(len(df))
@@ -218,12 +178,10 @@ def progressive_passes(match_id, team, ax, inverse=False):
 
 
 def final_3rd_passes(match_id, team, ax, inverse=False):
-        passes = fetch_match_pass_data(match_id)
+        passes = fetch_match_bundle(match_id).passes
         df = passes[passes.team==team]
         
-        df[['start_x', 'start_y']] = pd.DataFrame(df['location'].tolist(), index=df.index)
-        df["end_x"] = [df["pass"][i]['end_location'][0] for i in df.index]
-        df["end_y"] = [df["pass"][i]['end_location'][1] for i in df.index]
+        df = df.rename(columns={'x': 'start_x', 'y': 'start_y'})
 
         if inverse:
             df['start_x'] = 120 - df['start_x']
@@ -233,8 +191,7 @@ def final_3rd_passes(match_id, team, ax, inverse=False):
 
         df['to_final_3rd'] = df['end_x'] > 80 if not inverse else df['end_x'] < 40
         
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
         df = df[df['to_final_3rd']==True]
         df.index = range(len(df))
@@ -245,12 +202,10 @@ def final_3rd_passes(match_id, team, ax, inverse=False):
 
 
 def penalty_passes(match_id, team, ax, inverse=False):
-        passes = fetch_match_pass_data(match_id)
+        passes = fetch_match_bundle(match_id).passes
         df = passes[passes.team==team]
         
-        df[['start_x', 'start_y']] = pd.DataFrame(df['location'].tolist(), index=df.index)
-        df["end_x"] = [df["pass"][i]['end_location'][0] for i in df.index]
-        df["end_y"] = [df["pass"][i]['end_location'][1] for i in df.index]
+        df = df.rename(columns={'x': 'start_x', 'y': 'start_y'})
 
         if inverse:
             df['start_x'] = 120 - df['start_x']
@@ -260,8 +215,7 @@ def penalty_passes(match_id, team, ax, inverse=False):
 
         df['to_penalty'] = (df['end_x'].between(102, 120) & df['end_y'].between(18, 62)) if not inverse else (df['end_x'].between(0, 18) & df['end_y'].between(18, 62))
         
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
         df = df[df['to_penalty']==True]
         df.index = range(len(df))
@@ -272,48 +226,38 @@ def penalty_passes(match_id, team, ax, inverse=False):
 
 
 def team_convex_hull(match_id, team, ax, inverse=False):
-        events = fetch_match_data(match_id)
-        events = events[events["team"]==team]
+        hulls = match_hulls(match_id)
+        hulls = hulls[hulls["team"]==team].set_index("player")
         startingXI = get_starting_XI(match_id, team)
 
-        events = events[events["location"].notna()]
-        events['x'], events['y'] = zip(*events['location'])
-        if inverse:
-                events['x'] = 120 - events['x']
-                events['y'] = 80 - events['y']
-        
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
         colors = ['#eb4034', '#ebdb34', '#98eb34', '#34eb77', '#be9cd9', '#5797e6',
                    '#fbddad', '#de34eb', '#eb346b', '#34ebcc', '#dbd5d5']
         colordict = dict(zip(startingXI, colors))
 
+        polygons, facecolors, edgecolors = [], [], []
         for player in startingXI:
-                tempdf = events[events["player"]==player]
-                # threshold of 0.75 sd
-                tempdf = tempdf[np.abs(stats.zscore(tempdf[['x','y']])) < 0.75]
-                actions =  tempdf[['x','y']].dropna().values
-                
+                if player not in hulls.index:
+                        continue
+                row = hulls.loc[player]
                 if player not in annotation_fix_dict.keys():
                     annotation_text = player.split(" ")[-1]
                 else:
                     annotation_text = annotation_fix_dict[player].split(" ")[-1]
-                pitch.annotate(annotation_text, xy=(np.mean(tempdf.x), np.mean(tempdf.y)),
+                pitch.annotate(annotation_text, xy=(120 - row.x, 80 - row.y) if inverse else (row.x, row.y),
                                 c=colordict[player], va='center', ha='center',
                                 size=10, fontweight='bold',
                                 ax=ax)
-        
-                try:
-                    hull = ConvexHull(actions)
-                except:
-                    pass
-                try:
-                    for i in hull.simplices:
-                        ax.plot(actions[i, 0], actions[i, 1], colordict[player])
-                        ax.fill(actions[hull.vertices, 0], actions[hull.vertices, 1], c=colordict[player], alpha=0.03)
-                except:
-                        pass
+
+                if isinstance(row.hull, np.ndarray):
+                        polygons.append([120, 80] - row.hull if inverse else row.hull)
+                        # the hull used to be filled once per edge at alpha 0.03, keep the resulting shade
+                        facecolors.append(to_rgba(colordict[player], 1 - 0.97 ** len(row.hull)))
+                        edgecolors.append(colordict[player])
+        # all outlines above all fills, like the lines and patches drawn before
+        ax.add_collection(PolyCollection(polygons, facecolors=facecolors, edgecolors='none', zorder=1))
+        ax.add_collection(LineCollection([np.vstack([polygon, polygon[:1]]) for polygon in polygons], colors=edgecolors, linewidths=1.5, zorder=2))
 
         ax.set_title(f'{team} Action Territories', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
 
@@ -332,28 +276,26 @@ def shot_types(match_id, home_team, away_team, ax):
         }
 
         
-        pitch = VerticalPitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
-
-        shots = fetch_match_shot_data(match_id)
+        pitch = draw_pitch(ax, vertical=True, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
-        shots[['start_x', 'start_y']] = pd.DataFrame(shots['location'].tolist(), index=shots.index)
-        shots.index = range(len(shots))
+        shots = fetch_match_bundle(match_id).shots.reset_index(drop=True)
+        shots = shots.rename(columns={'x': 'start_x', 'y': 'start_y'})
 
-        for i in range(len(shots)):
-                if shots.iloc[i].team==home_team:
-                        ax.scatter(shots["start_y"][i], shots["start_x"][i],
+        # one scatter per team and outcome, as every outcome has its own marker
+        for (team, outcome), team_shots in shots.groupby(['team', 'outcome'], observed=True):
+                if team==home_team:
+                        ax.scatter(team_shots["start_y"], team_shots["start_x"],
                                 color=country_colors[home_team],
                                 edgecolors='white',
-                                marker=outcome_dict[shots["shot"][i]["outcome"]["name"]],
+                                marker=outcome_dict[outcome],
                                 s=120)
                 else:
                         # vertical pitch, therefore y and coords exchanged
-                        ax.scatter(80-shots["start_y"][i], 120-shots["start_x"][i],
+                        ax.scatter(80-team_shots["start_y"], 120-team_shots["start_x"],
                                 color=country_colors[away_team],
                                 edgecolors='white',
-                                marker=outcome_dict[shots["shot"][i]["outcome"]["name"]],
-                                s=120)   
+                                marker=outcome_dict[outcome],
+                                s=120)
 
         legend_elements=[Line2D([], [], marker='s', linestyle='None', markersize=10, label='Blocked', markerfacecolor='white', markeredgecolor='black'),
                         Line2D([], [], marker='*', linestyle='None', markersize=10, label='Goal', markerfacecolor='white', markeredgecolor='black'),
@@ -369,27 +311,23 @@ def shot_types(match_id, home_team, away_team, ax):
 
 
 def passing_sonars(match_id, team, ax, inverse=False):
-        passes = fetch_match_pass_data(match_id)
-        df = passes[passes['team']==team]
-        df = df[['pass', 'player']]
+        passes = fetch_match_bundle(match_id).passes
+        passes = passes[passes['team']==team]
+        df = passes[['angle', 'length', 'player']]
         df.index = range(len(df))
-        df['angle'] = [df['pass'][i]['angle'] for i in range(len(df))]
-        df['length'] = [df['pass'][i]['length'] for i in range(len(df))]
 
         # we divide into 20 bins
         df['angle_bin'] = pd.cut(df['angle'], bins=np.linspace(-np.pi,np.pi,21),
                                 labels=False, include_lowest=True)
 
-        pass_sonar = df.groupby(["player", "angle_bin"], as_index=False)
+        pass_sonar = df.groupby(["player", "angle_bin"], as_index=False, observed=True)
         pass_sonar = pass_sonar.agg({"length": "mean"})
         # count occurances of passes in particular bins
-        counter  = df.groupby(['player', 'angle_bin']).size().to_frame(name = 'amount').reset_index()
+        counter  = df.groupby(['player', 'angle_bin'], observed=True).size().to_frame(name = 'amount').reset_index()
         pass_sonar = pd.concat([pass_sonar, counter["amount"]], axis=1)
 
         # average location of players
-        passes['x'], passes['y'] = zip(*passes['location'])
-        passes = passes[passes['team']==team]
-        average_location = passes.groupby('player').agg({'x': ['mean'], 'y': ['mean']})
+        average_location = passes.groupby('player', observed=True).agg({'x': ['mean'], 'y': ['mean']})
         average_location.columns = ['x', 'y']
 
         if inverse:
@@ -403,28 +341,21 @@ def passing_sonars(match_id, team, ax, inverse=False):
 
         pass_sonar = pass_sonar[pass_sonar['player'].isin(startingXI)]
         
-        pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-        pitch.draw(ax=ax)
-
-        for player in startingXI:
-                for _, row in pass_sonar[pass_sonar.player == player].iterrows():
-                        theta_left_start = 198
-
-                        opacity = 0.4 if row.amount < 3 else 0.77 if row.amount < 5 else 1
-                        
-                        theta_left = theta_left_start + (360 / 20) * (row.angle_bin)
-                        theta_right = theta_left - (360 / 20)
-                        
-                        pass_wedge = pat.Wedge(
-                        center=(row.x, row.y),
-                        r=row.length*0.2,
-                        theta1=theta_right,
-                        theta2=theta_left,
-                        facecolor=country_colors[team],
-                        edgecolor="black",
-                        alpha=opacity,
-                        )
-                        ax.add_patch(pass_wedge)
+        pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
+
+        # players in starting XI order, all wedges drawn as one collection
+        order = {player: i for i, player in enumerate(startingXI)}
+        pass_sonar = pass_sonar.iloc[np.argsort(pass_sonar['player'].astype(object).map(order).to_numpy(), kind='stable')]
+        theta_left_start = 198
+        theta_left = theta_left_start + (360 / 20) * pass_sonar['angle_bin'].to_numpy()
+        theta_right = theta_left - (360 / 20)
+        wedges = [pat.Wedge(center=(x, y), r=length*0.2, theta1=right, theta2=left)
+                  for x, y, length, right, left in zip(pass_sonar['x'], pass_sonar['y'], pass_sonar['length'], theta_right, theta_left)]
+        opacity = np.select([pass_sonar['amount'] < 3, pass_sonar['amount'] < 5], [0.4, 0.77], 1)
+        facecolors = np.tile(to_rgba(country_colors[team]), (len(wedges), 1))
+        edgecolors = np.tile(to_rgba('black'), (len(wedges), 1))
+        facecolors[:, 3] = edgecolors[:, 3] = opacity
+        ax.add_collection(PatchCollection(wedges, facecolors=facecolors, edgecolors=edgecolors))
 
         for _, row in average_location.iterrows():
                 if row.name in startingXI:
@@ -441,12 +372,8 @@ def passing_sonars(match_id, team, ax, inverse=False):
 
 
 def xG_flow(match_id, home_team, away_team, ax):
-        shots = fetch_match_shot_data(match_id)
-        shots.index = range(len(shots))
-
-        shots["xG"] = [shots["shot"][i]["statsbomb_xg"] for i in range(len(shots))]
-        shots["outcome"] = [shots["shot"][i]["outcome"]["name"] for i in range(len(shots))]
-        shots = shots[["minute", "second", "team", "player", "xG", "outcome"]]
+        shots = fetch_match_bundle(match_id).shots.reset_index(drop=True)
+        shots = shots[["minute", "second", "team", "player", "xg", "outcome"]].rename(columns={"xg": "xG"})
 
         a_xG = [0]
         h_xG= [0]
@@ -467,17 +394,6 @@ def xG_flow(match_id, home_team, away_team, ax):
         a_xG = cumsum(a_xG)
         h_xG = cumsum(h_xG)
 
-        # make the plot finish at the end of an axis for both teams
-        if(a_min[-1]>h_min[-1]):
-                h_min.append(a_min[-1])
-                h_xG.append(h_xG[-1])
-        elif (h_min[-1]>a_min[-1]):
-                a_min.append(h_min[-1])
-                a_xG.append(a_xG[-1])
-
-        a_xG_total = round(a_xG[-1], 2)
-        h_xG_total = round(h_xG[-1], 2)
-
         # goals
         goals = shots[shots['outcome']=='Goal']
         a_goals, h_goals = [], []
@@ -491,6 +407,32 @@ def xG_flow(match_id, home_team, away_team, ax):
             else:
                 h_goals.append((row['minute'], h_xG[h_min.index(row['minute'])], annotation_text))
 
+        # own goals are marked like goals of the team they count for
+        events = fetch_match_data(match_id)
+        for _, row in events.query('type == "Own Goal Against"').iterrows():
+            for_team = home_team if row['team'] == away_team else away_team
+            xG = shots[(shots['minute'] < row['minute']) & (shots['team']==for_team)]['xG'].sum()
+            (h_goals if for_team == home_team else a_goals).append((row['minute'], xG, 'Own Goal'))
+
+        plot_xG_flow(home_team, away_team, h_min, h_xG, a_min, a_xG, h_goals, a_goals, ax)
+
+
+def plot_xG_flow(home_team, away_team, h_min, h_xG, a_min, a_xG, h_goals, a_goals, ax):
+        # cumulative xG steps of both teams starting at (0, 0) and their goals as (minute, xG, label);
+        # also drawn from the running sums of live.LiveMatch
+        h_min, h_xG, a_min, a_xG = list(h_min), list(h_xG), list(a_min), list(a_xG)
+
+        # make the plot finish at the end of an axis for both teams
+        if(a_min[-1]>h_min[-1]):
+                h_min.append(a_min[-1])
+                h_xG.append(h_xG[-1])
+        elif (h_min[-1]>a_min[-1]):
+                a_min.append(h_min[-1])
+                a_xG.append(a_xG[-1])
+
+        a_xG_total = round(a_xG[-1], 2)
+        h_xG_total = round(h_xG[-1], 2)
+
         ax.axis('on')
         ax.tick_params(axis='x', colors='white')
         ax.tick_params(axis='y', colors='white')
@@ -512,18 +454,7 @@ def xG_flow(match_id, home_team, away_team, ax):
         for goal in h_goals:
             ax.annotate(goal[2], (goal[0], goal[1]), textcoords="offset points",
                         xytext=(0,10), ha='center', color='white', fontsize=10, fontname='Monospace')
-        
-        # Handling Own Goals
-        events = fetch_match_data(match_id)
-        for _, row in events.query('type == "Own Goal Against"').iterrows():
-            color = country_colors[home_team] if row['team'] == away_team else country_colors[away_team]
-            for_team = home_team if row['team'] == away_team else away_team
-            y = row['minute']
-            x = shots[shots['minute'] < row['minute']][shots['team']==for_team]['xG'].sum()
-            ax.scatter(y, x, color=color, zorder=10, s=250, marker='h', edgecolor='white')
-            ax.annotate(f'Own Goal', (y, x), textcoords="offset points",
-                        xytext=(0,10), ha='center', color='white', fontsize=10, fontname='Monospace')
-              
+
 
         ax.grid(ls='dotted',lw=.5,color='lightgrey',axis='y',zorder=1)
 
@@ -546,20 +477,14 @@ def xG_flow(match_id, home_team, away_team, ax):
 def shot_xg(match_id, team, ax, inverse=False):
     events = fetch_match_data(match_id)
     shots = events.query(f' type == "Shot" and team == "{team}"')
-    shots['x'], shots['y'] = zip(*shots['location'])
 
-    pitch = VerticalPitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc', half=True)
-    pitch.draw(ax=ax)
+    pitch = draw_pitch(ax, vertical=True, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc', half=True)
 
     color = country_colors[team]
-    for _, row in shots.iterrows():
-        marker = '*' if row['shot_outcome'] == 'Goal' else 'o'
-        ax.scatter(row["y"], row["x"],
-                color=color,
-                edgecolors='white',
-                marker=marker,
-                s=row['shot_statsbomb_xg']*650
-        )
+    # one scatter per marker, goals on top
+    goals = shots['outcome'] == 'Goal'
+    for marker, mask in (('o', ~goals), ('*', goals)):
+        ax.scatter(shots['y'][mask], shots['x'][mask], color=color, edgecolors='white', marker=marker, s=shots['xg'][mask]*650)
 
     legend_elements=[Line2D([], [], marker='o', linestyle='None', markersize=3, label='xG = 0.2', markerfacecolor='white', markeredgecolor='black'),
                     Line2D([], [], marker='o', linestyle='None', markersize=6, label='xG = 0.4', markerfacecolor='white', markeredgecolor='black'),
@@ -572,27 +497,22 @@ def shot_xg(match_id, team, ax, inverse=False):
 
 
 def pass_heatmap(match_id, team, ax, inverse=False):
-    passes = fetch_match_pass_data(match_id)
+    passes = fetch_match_bundle(match_id).passes
     passes = passes.query(f'team == "{team}"')
 
-    pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
-    pitch.draw(ax=ax)
+    pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
 
-    passes['x'], passes['y'] = zip(*passes['location'])
+    x, y = passes['x'].to_numpy(), passes['y'].to_numpy()
     if inverse:
-        passes['x'] = 120 - passes['x']
-        passes['y'] = 80 - passes['y']
-
-    sns.kdeplot(
-            x=passes["x"],
-            y=passes["y"],
-            fill = True,
-            shade_lowest=False,
-            alpha=.6,
-            n_levels=10,
-            cmap = LinearSegmentedColormap.from_list('', [lighten_hex_color(country_colors[team], 0.45), country_colors[team]], N=100),
-            ax=ax
-        )
+        x, y = 120 - x, 80 - y
+
+    # same estimate and iso-proportion levels seaborn.kdeplot draws, binned and smoothed by FFT
+    with preparing():
+        kde = binned_kde(x, y)
+    if kde is not None:
+        xs, ys, density = kde
+        ax.contourf(xs, ys, density, levels=iso_proportion_levels(density), alpha=.6,
+                    cmap=LinearSegmentedColormap.from_list('', [lighten_hex_color(country_colors[team], 0.45), country_colors[team]], N=100))
     ax.set_xlim(0,120)
     ax.set_ylim(80,0)
 
@@ -600,23 +520,24 @@ def pass_heatmap(match_id, team, ax, inverse=False):
 
 
 def xT_scatterplot(match_id, home_team, away_team, ax):
-    xtdf = get_players_xT(match_id)
+    with preparing():
+        xtdf = get_players_xT(match_id)
 
     top_xT = xtdf.sort_values('total_xT', ascending=False).head(5)['player'].values
     top_pass_xT = xtdf.sort_values('pass_xT', ascending=False).head(5)['player'].values
     top_carry_xT = xtdf.sort_values('carry_xT', ascending=False).head(5)['player'].values
 
     ax.axis('on')
-    for _, row in xtdf.iterrows():
-        ax.scatter(
-            x=row['pass_xT'],
-            y=row['carry_xT'],
-            s=100,
-            color=country_colors[row['team']],
-            edgecolor='white',
-            linewidth=1
-        )
+    ax.scatter(
+        x=xtdf['pass_xT'],
+        y=xtdf['carry_xT'],
+        s=100,
+        color=[country_colors[team] for team in xtdf['team']],
+        edgecolor='white',
+        linewidth=1
+    )
 
+    for _, row in xtdf.iterrows():
         if row['player'] in top_pass_xT or row['player'] in top_carry_xT or row['player'] in top_xT:
             if row['player'] not in annotation_fix_dict.keys():
                 annotation_text = row['player'].split(" ")[-1]
@@ -649,22 +570,10 @@ def xT_scatterplot(match_id, home_team, away_team, ax):
 
        
 def xT_heatmap(match_id, team, ax, inverse=False):
-    events = fetch_match_data(match_id)
-    events = events[events['team']==team]
-
-    xtdf = pd.concat([get_xT(events, 'Pass'), get_xT(events, 'Carry')], axis=0)
-    
-    if inverse:
-        xtdf['start_x'] = 120 - xtdf['start_x']
-        xtdf['end_x'] = 120 - xtdf['end_x']
-        xtdf['start_y'] = 80 - xtdf['start_y']
-        xtdf['end_y'] = 80 - xtdf['end_y']
+    bin_statistic = fetch_match_bundle(match_id).grid(team, 'xT', (12, 9), inverse)
 
+    pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)
 
-    pitch = Pitch(pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)
-    pitch.draw(ax=ax)
-
-    bin_statistic = pitch.bin_statistic(xtdf.start_x, xtdf.start_y, values=xtdf.xT, statistic='sum', bins=(12, 9), normalize=False)
     pitch.heatmap(bin_statistic, edgecolor='None', ax=ax, alpha=0.65,
             cmap=LinearSegmentedColormap.from_list('', ["#f3f9ff", darken_hex_color(country_colors[team], 0.3)], N=20))
 
@@ -678,38 +587,21 @@ def xT_heatmap(match_id, team, ax, inverse=False):
     ax.set_title(f'{team} xT Pass+Carry (Start Zones)', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
 
 
-def xT_momentum(match_id, home_team, away_team, ax):
-    df = fetch_match_data(match_id)
-    home_color, away_color = country_colors[home_team], country_colors[away_team]
-
-    xT_data = pd.concat([get_xT(events=df, type='Pass', momentum=True), get_xT(events=df, type='Carry', momentum=True)], axis=0)
-    xT_data['xT_clipped'] = np.clip(xT_data['xT'], 0, 0.1)
-
-    max_xT_per_minute = xT_data.groupby(['team', 'minute'])['xT_clipped'].max().reset_index()
+def xT_momentum(match_id, home_team, away_team, ax, window_size=WINDOW_SIZE, decay_rate=DECAY_RATE, resolution='minute'):
+    bundle = fetch_match_bundle(match_id)
+    df = bundle.events
 
-    minutes = sorted(xT_data['minute'].unique())
-    weighted_xT_sum = {team: [] for team in max_xT_per_minute['team'].unique()}
-    momentum = []
-
-    window_size = 4
-    decay_rate = 0.25
-
-    for current_minute in minutes:
-        for team in weighted_xT_sum:
-            recent_xT_values = max_xT_per_minute[(max_xT_per_minute['team'] == team) & 
-                                                    (max_xT_per_minute['minute'] <= current_minute) & 
-                                                    (max_xT_per_minute['minute'] > current_minute - window_size)]
-            
-            weights = np.exp(-decay_rate * (current_minute - recent_xT_values['minute'].values))
-            weighted_sum = np.sum(weights * recent_xT_values['xT_clipped'].values)
-            weighted_xT_sum[team].append(weighted_sum)
+    with preparing():
+        momentum_df = momentum(bundle.xT, home_team, away_team, window_size=window_size,
+                               decay_rate=decay_rate, resolution=resolution)
+    goals = df[(df['outcome']=='Goal') | (df['type']=='Own Goal For')][['minute', 'team']]
+    plot_xT_momentum(home_team, away_team, momentum_df, goals, ax)
 
-        momentum.append(weighted_xT_sum[home_team][-1] - weighted_xT_sum[away_team][-1])
 
-    momentum_df = pd.DataFrame({
-        'minute': minutes,
-        'momentum': momentum
-    })
+def plot_xT_momentum(home_team, away_team, momentum_df, goals, ax):
+    # momentum_df as momentum.momentum returns it, goals a frame of their minute and team;
+    # also drawn from the running state of live.LiveMatch
+    home_color, away_color = country_colors[home_team], country_colors[away_team]
 
     ax.axis('on')
     ax.tick_params(axis='x', colors='white')
@@ -731,8 +623,6 @@ def xT_momentum(match_id, home_team, away_team, ax):
     ax.set_ylabel('Momentum', color='white', fontsize=15, fontweight='bold', fontfamily='Monospace')
     ax.set_title(f'xT Momentum', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
 
-    goals = df[(df['shot_outcome']=='Goal') | (df['type']=='Own Goal For')][['minute', 'team']]
-
     for _, row in goals.iterrows():
         ymin, ymax = (0.5, 0.86) if row['team'] == home_team else (0.14, 0.5)
         ax.axvline(row['minute'], color='white', linestyle='--', linewidth=1.2, alpha=0.8, ymin=ymin, ymax=ymax)
@@ -740,6 +630,107 @@ def xT_momentum(match_id, home_team, away_team, ax):
         ax.text(row['minute']+0.1, (1 if row['team'] == home_team else -1)*0.067, 'Goal', fontsize=10, ha='center', va='center', fontfamily="Monospace", color='white')
 
 
+def _direction_of_play(pitch, ax, inverse):
+    if not inverse:
+        pitch.annotate(text='The direction of play  ', xytext=(45, 84), xy=(85, 84), ha='center', va='center', ax=ax,
+                    arrowprops=dict(facecolor='white'), fontsize=12, color='white', fontweight="bold", family="monospace")
+    else:
+        pitch.annotate(text='  The direction of play', xytext=(75, 84), xy=(35, 84), ha='center', va='center', ax=ax,
+                    arrowprops=dict(facecolor='white'), fontsize=12, color='white', fontweight="bold", family="monospace")
+
+
+# tournament panels cover the team's matches up to and including the selected one,
+# merged from per-match partials (see tournament.py) instead of reloading every match
+def tournament_pressure_heatmap(match_id, team, ax, inverse=False):
+    match_ids = team_match_ids(match_id, team)
+    bin_statistic = tournament_grid(match_ids, team, 'pressures')
+    if inverse:
+        bin_statistic['statistic'] = bin_statistic['statistic'][::-1, ::-1]
+
+    pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)
+    pitch.heatmap(bin_statistic, edgecolor='#323b49', ax=ax, alpha=0.55,
+            cmap=LinearSegmentedColormap.from_list("custom_cmap", ["#f3f9ff", country_colors[team]], N=100))
+    pitch.label_heatmap(bin_statistic, color='#323b49', fontsize=12, ax=ax, ha='center', va='center',
+                         fontweight='bold', family='monospace', str_format='{:.0f}')
+    _direction_of_play(pitch, ax, inverse)
+
+    ax.set_title(f'{team} Pressures, {len(match_ids)} Matches', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
+
+
+def tournament_xT_heatmap(match_id, team, ax, inverse=False):
+    match_ids = team_match_ids(match_id, team)
+    bin_statistic = tournament_grid(match_ids, team, 'xT')
+    if inverse:
+        bin_statistic['statistic'] = bin_statistic['statistic'][::-1, ::-1]
+
+    pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)
+    pitch.heatmap(bin_statistic, edgecolor='None', ax=ax, alpha=0.65,
+            cmap=LinearSegmentedColormap.from_list('', ["#f3f9ff", darken_hex_color(country_colors[team], 0.3)], N=20))
+    _direction_of_play(pitch, ax, inverse)
+
+    ax.set_title(f'{team} xT Start Zones, {len(match_ids)} Matches', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
+
+
+def tournament_passing_network_viz(match_id, team, ax, inverse=False):
+    match_ids = team_match_ids(match_id, team)
+    n_matches = max(len(match_ids), 1)
+    average_location, passes_between = tournament_passing_network(match_ids, team)
+    if inverse:
+        average_location = average_location.assign(x=120 - average_location.x, y=80 - average_location.y)
+        passes_between = passes_between.assign(x=120 - passes_between.x, y=80 - passes_between.y,
+                                               x_end=120 - passes_between.x_end, y_end=80 - passes_between.y_end)
+    # same threshold and scaling as the single match network, per match on average
+    passes_between = passes_between.loc[(passes_between['pass_count']/n_matches>1)]
+
+    pitch = draw_pitch(ax, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')
+
+    pitch.arrows(passes_between.x, passes_between.y,
+                    passes_between.x_end, passes_between.y_end,
+                    color='#d4d4d4',
+                    alpha=(pd.to_numeric(passes_between["pass_count"], downcast="float")/n_matches/20).clip(upper=1),
+                    ax=ax
+                )
+    pitch.scatter(average_location.x, average_location.y,
+                    s = pd.to_numeric(average_location["count"], downcast="float")/n_matches*25,
+                    color=country_colors[team], edgecolors='white',
+                    ax=ax
+                )
+
+    for _, row in average_location.iterrows():
+            if row.name not in annotation_fix_dict.keys():
+                annotation_text = row.name.split(" ")[-1]
+            else:
+                annotation_text = annotation_fix_dict[row.name].split(" ")[-1]
+            pitch.annotate(annotation_text, xy=(row.x, row.y+3),
+                            c='white', va='center', ha='center',
+                            size=10, fontweight='bold',
+                            ax=ax
+                        )
+
+    ax.set_title(f'{team} Passing Network, {len(match_ids)} Matches', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
+
+
+def tournament_shot_map(match_id, team, ax, inverse=False):
+    match_ids = team_match_ids(match_id, team)
+    shots = tournament_shots(match_ids, team)
+
+    pitch = draw_pitch(ax, vertical=True, pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc', half=True)
+
+    color = country_colors[team]
+    goals = shots['outcome'] == 'Goal'
+    ax.scatter(shots['y'][~goals], shots['x'][~goals], color=color, edgecolors='white', marker='o', s=shots['xg'][~goals]*650, alpha=0.7)
+    ax.scatter(shots['y'][goals], shots['x'][goals], color=color, edgecolors='white', marker='*', s=shots['xg'][goals]*650)
+
+    legend_elements=[Line2D([], [], marker='o', linestyle='None', markersize=3, label='xG = 0.2', markerfacecolor='white', markeredgecolor='black'),
+                    Line2D([], [], marker='o', linestyle='None', markersize=6, label='xG = 0.4', markerfacecolor='white', markeredgecolor='black'),
+                    Line2D([], [], marker='o', linestyle='None', markersize=9, label='xG = 0.6', markerfacecolor='white', markeredgecolor='black'),
+                    Line2D([], [], marker='o', linestyle='None', markersize=12, label='xG = 0.8', markerfacecolor='white', markeredgecolor='black'),
+                    Line2D([], [], marker='o', linestyle='None', markersize=15, label='xG = 1', markerfacecolor='white', markeredgecolor='black')]
+    ax.legend(handles=legend_elements, loc='lower center')
+
+    ax.set_title(f'{team} Shots, {len(match_ids)} Matches, {shots["xg"].sum():.1f} xG', color='white', fontsize=20, fontweight='bold', fontfamily='Monospace', pad=-5)
+
+
 viz_dict = {
         "Overview": overview,
         "Voronoi Diagram": voronoi,
@@ -756,5 +747,9 @@ viz_dict = {
         'xT Heatmap': xT_heatmap,
         'Passes to Final 3rd': final_3rd_passes,
         'Passes to Penalty Area': penalty_passes,
-        'xT Momentum': xT_momentum
+        'xT Momentum': xT_momentum,
+        'Tournament Passing Network': tournament_passing_network_viz,
+        'Tournament Pressure Heatmap': tournament_pressure_heatmap,
+        'Tournament xT Heatmap': tournament_xT_heatmap,
+        'Tournament Shot Map': tournament_shot_map
 }
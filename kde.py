@@ -0,0 +1,58 @@
+import numpy as np
+from scipy.signal import fftconvolve
+
+from xt import PITCH_LENGTH, PITCH_WIDTH
+
+
+# defaults of the seaborn.kdeplot call pass_heatmap used: Scott's rule bandwidth, support
+# reaching cut bandwidths past the pitch, ten iso-proportion levels from the 5% lowest mass
+CUT = 3
+CELL = 0.5       # grid cell side in yards
+LEVELS = 10
+THRESH = 0.05
+
+
+def _kernel(covariance, cell, reach):
+    # full covariance gaussian sampled on the grid, as scipy's gaussian_kde uses it
+    half = np.ceil(reach / cell).astype(int)
+    dx = np.arange(-half[0], half[0] + 1) * cell
+    dy = np.arange(-half[1], half[1] + 1) * cell
+    xx, yy = np.meshgrid(dx, dy)
+    offsets = np.stack([xx.ravel(), yy.ravel()])
+    inverse = np.linalg.inv(covariance)
+    exponent = np.einsum('ij,ik,kj->j', offsets, inverse, offsets)
+    kernel = np.exp(-0.5 * exponent).reshape(xx.shape)
+    return kernel / (2 * np.pi * np.sqrt(np.linalg.det(covariance)))
+
+
+def binned_kde(x, y, bw_adjust=1.0, cell=CELL, cut=CUT):
+    # gaussian KDE of the points with scipy's default (Scott) bandwidth: the points are counted on a
+    # fixed grid over the pitch and that histogram is convolved with the kernel by FFT, so the cost
+    # depends on the grid instead of on the number of points; returns grid centers and the density
+    # (rows along the pitch width), or None when there are too few points to estimate one
+    points = np.stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+    points = points[:, np.isfinite(points).all(axis=0)]
+    n = points.shape[1]
+    if n < 3:
+        return None
+    covariance = np.cov(points) * (n ** (-1 / 6) * bw_adjust) ** 2
+    if np.linalg.det(covariance) <= 0:
+        return None
+
+    bw = np.sqrt(np.diag(covariance))
+    margin = np.ceil(cut * bw / cell) * cell
+    x_edges = np.arange(-margin[0], PITCH_LENGTH + margin[0] + cell / 2, cell)
+    y_edges = np.arange(-margin[1], PITCH_WIDTH + margin[1] + cell / 2, cell)
+    counts = np.histogram2d(points[1], points[0], bins=[y_edges, x_edges])[0]
+    # the kernel reaches past the support so no mass is cut off inside it
+    density = fftconvolve(counts, _kernel(covariance, cell, (cut + 1) * bw), mode='same') / n
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, np.clip(density, 0, None)
+
+
+def iso_proportion_levels(density, levels=LEVELS, thresh=THRESH):
+    # density values enclosing 1 - p of the total mass for p evenly spaced from thresh to 1,
+    # the contour levels seaborn.kdeplot draws
+    proportions = np.linspace(thresh, 1, levels)
+    values = np.sort(density.ravel())[::-1]
+    mass = np.cumsum(values) / values.sum()
+    return np.take(values, np.searchsorted(mass, 1 - proportions), mode='clip')
@@ -0,0 +1,31 @@
+# panels that fit each column of the dashboard; the middle one shows both teams
+SIDE_CHARTS = ["None", "Passing Network", "Passing Sonars", "Shot xG", "Pass Heatmap", "xT Heatmap", "Pressure Heatmap",  "Action Territories",
+               'Progressive Passes', "Passes to Final 3rd", "Passes to Penalty Area",
+               "Tournament Passing Network", "Tournament Pressure Heatmap", "Tournament xT Heatmap", "Tournament Shot Map"]
+MIDDLE_CHARTS = ["None", "Overview", 'xT Momentum', 'xG Flow', "Voronoi Diagram", 'xT by Players', "Shot Types"]
+MIN_ROWS, MAX_ROWS = 2, 5
+
+
+def build_layout(rows, symmetrical=False):
+    # rows of [left, middle, right] panel names, or [side, middle] with a symmetrical layout where
+    # the side panel is mirrored for the away team; returns the grid the creator menu produces,
+    # with the header as row 0
+    if not MIN_ROWS <= len(rows) <= MAX_ROWS:
+        raise ValueError(f'A dashboard has between {MIN_ROWS} and {MAX_ROWS} rows, got {len(rows)}')
+
+    selected_options = [[None for _ in range(3)]]
+    for row in rows:
+        row = list(row)
+        if symmetrical:
+            if len(row) != 2:
+                raise ValueError(f'Rows of a symmetrical layout are [side, middle], got {row}')
+            row = [row[0], row[1], row[0]]
+        elif len(row) != 3:
+            raise ValueError(f'Rows are [left, middle, right], got {row}')
+
+        for j, viz_name in enumerate(row):
+            charts = MIDDLE_CHARTS if j == 1 else SIDE_CHARTS
+            if viz_name not in charts:
+                raise ValueError(f'{viz_name!r} cannot be used in column {j + 1}, choose from {charts}')
+        selected_options.append(row)
+    return selected_options
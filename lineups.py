@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+
+LINEUP_COLUMNS = ['team', 'player', 'position', 'jersey_number', 'started', 'on', 'off', 'replaced', 'replaced_by']
+# substitutes coming on before this minute count as part of the starting XI of the panels
+EARLY_SUBSTITUTION = 30
+# cards that send a player off, in foul_committed_card and bad_behaviour_card
+SENDING_OFF_CARDS = ('Red Card', 'Second Yellow')
+# stride of a period on the clock, longer than any period runs (minutes count on from the previous ones)
+PERIOD_SECONDS = 10000
+
+
+def clock(period, minute, second):
+    # (period, minute, second) as one sortable number: first half stoppage time (period 1, 45:00 onwards)
+    # comes before the second half kicks off at 45:00
+    return period * PERIOD_SECONDS + minute * 60 + second
+
+
+def _clock(events):
+    return clock(events['period'].to_numpy(np.int32), events['minute'].to_numpy(np.int32),
+                 events['second'].to_numpy(np.int32))
+
+
+def _leaving(events):
+    # rows of the events a player leaves the pitch for good with: a sending-off, or a Player Off that
+    # is permanent (no substitutes left); a temporary one for treatment is followed by a Player On
+    return (events['foul_committed_card'].isin(SENDING_OFF_CARDS)
+            | events['bad_behaviour_card'].isin(SENDING_OFF_CARDS)
+            | ((events['type'] == 'Player Off') & events['player_off_permanent'])).to_numpy()
+
+
+def lineup_table(events):
+    # one row per player who took part, each team's starting XI in lineup order and then the substitutes
+    # in the order they came on; on and off are times on the clock above, off is inf for players still on
+    # the pitch at the end, a substitute takes over the position of the player they came on for and a
+    # player sent off leaves with no one replacing them
+    rows, index, teams = [], {}, set()
+    starting = events[events['type']=='Starting XI']
+    for team, tactics in zip(starting['team'], starting['tactics']):
+        if team in teams:
+            continue
+        teams.add(team)
+        for p in tactics['lineup']:
+            index[team, p['player']['name']] = len(rows)
+            rows.append([team, p['player']['name'], p['position']['name'], p.get('jersey_number'), True,
+                         0, np.inf, None, None])
+
+    changes = events[events['substitution_replacement'].notna().to_numpy() | _leaving(events)]
+    replacements = changes['substitution_replacement']
+    times = _clock(changes)
+    # in match order, so a substitute sent off later is already in the table
+    for i in np.argsort(times, kind='stable'):
+        team, player, replacement = changes['team'].iat[i], changes['player'].iat[i], replacements.iat[i]
+        off = index.get((team, player))
+        if off is not None:
+            rows[off][6] = min(rows[off][6], times[i])
+        if pd.isna(replacement):
+            continue
+        position = None
+        if off is not None:
+            rows[off][8] = replacement
+            position = rows[off][2]
+        index[team, replacement] = len(rows)
+        rows.append([team, replacement, position, None, False, times[i], np.inf, player, None])
+
+    lineups = pd.DataFrame(rows, columns=LINEUP_COLUMNS)
+    lineups['on'] = lineups['on'].astype(np.float64)
+    lineups['off'] = lineups['off'].astype(np.float64)
+    return lineups
+
+
+def on_pitch(lineups, team, period, minute, second=0):
+    # players of the team on the pitch at that moment, starters first
+    t = clock(period, minute, second)
+    on = lineups['on'].to_numpy()
+    off = lineups['off'].to_numpy()
+    return lineups['player'][(lineups['team'] == team).to_numpy() & (on <= t) & (off > t)].tolist()
+
+
+def starting_XI(lineups, team, early=EARLY_SUBSTITUTION):
+    # the team's starters in lineup order, with the ones substituted before minute early replaced
+    # by whoever came on for them (a player sent off by then stays, no one took their place)
+    starters = lineups[(lineups['team'] == team) & lineups['started']]
+    early_off = (starters['off'].to_numpy() < clock(1, early, 0)) & starters['replaced_by'].notna().to_numpy()
+    return [replaced_by if is_early else player
+            for player, replaced_by, is_early in zip(starters['player'], starters['replaced_by'], early_off)]
+
+
+def first_substitution(lineups):
+    # time of the first substitution of either team on the clock above, None without substitutions
+    on = lineups['on'][~lineups['started']]
+    return int(on.min()) if len(on) else None
@@ -0,0 +1,222 @@
+# Follows a match while it is played: new events are read from an append-only feed, the running xG sums
+# and xT momentum are updated with just those events and only the panels they changed are drawn again.
+#
+#   python live.py <feed> --home Germany --away Scotland --out live/ [--match 3930158] [--poll 0.5]
+#
+# <feed> is a JSON lines file (one raw StatsBomb event per line) that keeps growing, or the URL of one,
+# e.g. written by `python synthetic.py replay` and served by `python synthetic.py serve`.
+# <out>/xG_Flow.png and <out>/xT_Momentum.png are replaced whenever the panel changes.
+import argparse
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from attributes import compact_events
+from auxiliary import annotation_fix_dict
+from event_store import flat_events, _statsbombpy
+from momentum import RunningMomentum, WINDOW_SIZE, DECAY_RATE
+from xt import xT_actions
+
+
+PANELS = ('xG Flow', 'xT Momentum')
+
+
+class JsonLinesFeed:
+    # complete lines appended since the previous read; a line still being written is left for the next one
+
+    def __init__(self):
+        self.offset = 0
+
+    def _consume(self, data):
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+        return [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+
+
+class FileFeed(JsonLinesFeed):
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            return self._consume(f.read())
+
+
+class HttpFeed(JsonLinesFeed):
+    # asks only for the bytes past the offset; servers ignoring Range send the whole file
+
+    def __init__(self, url, timeout=5):
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+
+    def read(self):
+        request = urllib.request.Request(self.url, headers={'Range': f'bytes={self.offset}-'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = response.read()
+                if response.status != 206:
+                    data = data[self.offset:]
+        except urllib.error.HTTPError as e:
+            # 416: nothing past the offset yet, 404: the feed has not started
+            if e.code in (404, 416):
+                return []
+            raise
+        return self._consume(data)
+
+
+def open_feed(source):
+    return HttpFeed(source) if source.startswith(('http://', 'https://')) else FileFeed(source)
+
+
+class LiveMatch:
+    # running state of the xG Flow and xT Momentum panels, updated in O(new events) per batch and
+    # drawn with the same functions as the panels of a complete match; events must come in match order
+
+    def __init__(self, match_id, home_team, away_team, window_size=WINDOW_SIZE, decay_rate=DECAY_RATE,
+                 resolution='minute'):
+        self.match_id = match_id
+        self.home_team = home_team
+        self.away_team = away_team
+        self.n_events = 0
+        # bumped every time a panel changes, e.g. to key rendered tiles
+        self.versions = dict.fromkeys(PANELS, 0)
+
+        # xG Flow: cumulative steps from (0, 0), the xG of every shot and the goals as (minute, xG, label)
+        self.minutes = {home_team: [0], away_team: [0]}
+        self.xG = {home_team: [0], away_team: [0]}
+        self.shot_xG = {home_team: [], away_team: []}
+        self._first_xG = {home_team: {0: 0}, away_team: {0: 0}}
+        self.goals = {home_team: [], away_team: []}
+        self.own_goals = {home_team: [], away_team: []}
+
+        # xT Momentum
+        self.momentum = RunningMomentum(home_team, away_team, window_size, decay_rate, resolution)
+        self.goal_minutes = []
+
+    def update(self, raw):
+        # adds a batch of raw events from the feed; returns the panels it changed
+        if not raw:
+            return set()
+        events = compact_events(flat_events(self.match_id, raw))
+        self.n_events += len(events)
+        types = events['type']
+        changed = set()
+
+        shots = events[types=='Shot']
+        # a batch without any player (lineups, half starts...) has no player column either
+        if len(shots):
+            # numpy scalars rather than python floats, so the sums add up exactly as in the complete panel
+            shot_minutes, shot_xG = shots['minute'].to_numpy(), shots['xg'].to_numpy()
+            for i, (team, player, outcome) in enumerate(zip(shots['team'], shots['player'], shots['outcome'])):
+                if team not in self.xG:
+                    continue
+                minute, minutes, xG = shot_minutes[i], self.minutes[team], self.xG[team]
+                minutes.append(minute)
+                xG.append(xG[-1] + shot_xG[i])
+                self.shot_xG[team].append(shot_xG[i])
+                # a goal is marked at the xG of the first shot of its minute, as in the complete panel
+                self._first_xG[team].setdefault(minute, xG[-1])
+                if outcome == 'Goal':
+                    player = annotation_fix_dict.get(player, player)
+                    self.goals[team].append((minute, self._first_xG[team][minute], player.split(" ")[-1]))
+                changed.add('xG Flow')
+
+        for row in events[types=='Own Goal Against'].itertuples():
+            for_team = self.home_team if row.team == self.away_team else self.away_team
+            # xG of the team it counts for before that minute
+            earlier = np.asarray(self.minutes[for_team][1:]) < row.minute
+            xG = pd.Series(self.shot_xG[for_team], dtype=np.float32)[earlier].sum()
+            self.own_goals[for_team].append((row.minute, xG, 'Own Goal'))
+            changed.add('xG Flow')
+
+        if types.isin(['Pass', 'Carry']).any():
+            self.momentum.add(xT_actions(events))
+            changed.add('xT Momentum')
+        goals = events[(events['outcome']=='Goal') | (types=='Own Goal For')]
+        if len(goals):
+            self.goal_minutes.extend(zip(goals['minute'], goals['team']))
+            changed.add('xT Momentum')
+        # nothing to plot before the first action
+        if not self.momentum.length:
+            changed.discard('xT Momentum')
+
+        for name in changed:
+            self.versions[name] += 1
+        return changed
+
+    def draw(self, viz_name, ax):
+        from get_viz import plot_xG_flow, plot_xT_momentum
+        home, away = self.home_team, self.away_team
+        if viz_name == 'xG Flow':
+            plot_xG_flow(home, away, self.minutes[home], self.xG[home], self.minutes[away], self.xG[away],
+                         self.goals[home] + self.own_goals[home], self.goals[away] + self.own_goals[away], ax)
+        elif viz_name == 'xT Momentum':
+            plot_xT_momentum(home, away, self.momentum.frame(),
+                             pd.DataFrame(self.goal_minutes, columns=['minute', 'team']), ax)
+        else:
+            raise ValueError(f'{viz_name!r} cannot be followed live, choose from {PANELS}')
+
+
+def follow(feed, live, size, dpi=None, poll=0.5, on_update=None, idle_timeout=None):
+    # polls the feed until it has been silent for idle_timeout seconds (forever with None) and draws the
+    # panels every batch changed again; on_update(tiles, changed, seconds) gets all tiles drawn so far
+    from render import PREVIEW_DPI, render_live_panel
+    dpi = dpi or PREVIEW_DPI
+    # importing statsbombpy takes seconds, better before the first batch than with it
+    _statsbombpy()
+    tiles = {}
+    last = time.monotonic()
+    while idle_timeout is None or time.monotonic() - last < idle_timeout:
+        raw = feed.read()
+        if not raw:
+            time.sleep(poll)
+            continue
+        last = start = time.monotonic()
+        changed = live.update(raw)
+        for viz_name in changed:
+            tiles[viz_name] = render_live_panel(live, viz_name, size, dpi)
+        if on_update is not None:
+            on_update(tiles, changed, time.monotonic() - start)
+    return tiles
+
+
+if __name__ == '__main__':
+    from PIL import Image
+    from render import PREVIEW_DPI, dashboard_geometry
+
+    parser = argparse.ArgumentParser(description='Draw xG Flow and xT Momentum of a match as it is played')
+    parser.add_argument('feed', help='JSON lines file or URL the raw events are appended to')
+    parser.add_argument('--home', required=True)
+    parser.add_argument('--away', required=True)
+    parser.add_argument('--match', type=int, default=0)
+    parser.add_argument('--out', required=True, help='directory the panels are written to')
+    parser.add_argument('--poll', type=float, default=0.5, help='seconds between reads of an idle feed')
+    parser.add_argument('--dpi', type=int, default=PREVIEW_DPI)
+    parser.add_argument('--idle-timeout', type=float, default=None, help='stop once the feed is silent this long')
+    args = parser.parse_args()
+
+    # a middle column panel of a dashboard
+    row_heights, col_widths = dashboard_geometry(2, args.dpi)
+    size = (col_widths[1], row_heights[1])
+    live = LiveMatch(args.match, args.home, args.away)
+    os.makedirs(args.out, exist_ok=True)
+
+    def write(tiles, changed, seconds):
+        for viz_name in changed:
+            path = os.path.join(args.out, f"{viz_name.replace(' ', '_')}.png")
+            Image.fromarray(tiles[viz_name]).save(f'{path}.tmp', format='png')
+            os.replace(f'{path}.tmp', path)
+        print(f"{live.n_events:6} events  {', '.join(sorted(changed)) or '-':24} {seconds * 1000:7.1f} ms", flush=True)
+
+    follow(open_feed(args.feed), live, size, args.dpi, args.poll, write, args.idle_timeout)
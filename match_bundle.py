@@ -0,0 +1,225 @@
+import os
+import sys
+import threading
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+from attributes import compact_events, COMPACT_VERSION, CATEGORY_COLUMNS
+from cache import BoundedCache
+from event_store import load_events, save_table, load_table
+from lineups import lineup_table
+from profiling import preparing
+from xt import xT_actions
+
+
+# actions the spatial grids are built for: (bundle frame, x, y, summed values or None to count)
+GRID_ACTIONS = {
+    'pressures': ('pressures', 'x', 'y', None),
+    'passes': ('passes', 'x', 'y', None),
+    'xT': ('xT', 'start_x', 'start_y', 'xT'),
+}
+
+_grid_templates = {}
+
+
+@lru_cache(maxsize=None)
+def _pitch():
+    # imported on first use, so that loading matches (and the app's menus) does not wait for mplsoccer
+    from mplsoccer.pitch import Pitch
+    return Pitch(pitch_type='statsbomb')
+
+
+def _read_only(values):
+    values = np.array(values, copy=True)
+    values.flags.writeable = False
+    return values
+
+
+def freeze(df):
+    # the frame over read-only copies of its numeric columns (categorical codes included), so the panels
+    # can share it without copies and anything writing into it in place fails loudly instead of
+    # corrupting the cached match; object columns stay writeable since pandas' cython routines reject
+    # read-only ones. Every column keeps its own array (copy=False), marking a view of a shared block
+    # read-only would leave the block itself writeable
+    columns = {}
+    for col, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[col] = pd.Categorical.from_codes(_read_only(series.cat.codes), dtype=series.dtype)
+        elif isinstance(series.dtype, np.dtype) and series.dtype != object:
+            columns[col] = _read_only(series.to_numpy())
+        else:
+            columns[col] = series
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def sizeof(value):
+    # bytes held by a derived result: frames, arrays and containers of them
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes if value.dtype != object else value.nbytes + sum(sizeof(v) for v in value.ravel())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def grid_template(bins):
+    # the bin geometry of Pitch.bin_statistic, which does not depend on the data
+    if bins not in _grid_templates:
+        _grid_templates[bins] = _pitch().bin_statistic(np.array([]), np.array([]), statistic='count', bins=bins, normalize=False)
+    return dict(_grid_templates[bins])
+
+
+class MatchBundle:
+    # everything the panels need about one match, parsed once and shared between them;
+    # the frames are read-only, filter or copy them before adding columns
+
+    # frames holding their own memory, the per type ones are views into events
+    OWNED_FRAMES = ('events', 'xT', 'lineups')
+
+    def __init__(self, match_id, events, compact=False):
+        self.match_id = match_id
+        self.events = freeze(events if compact else compact_events(events))
+        self._rows = self._index_types(self.events['type'].to_numpy())
+
+    @classmethod
+    def load(cls, match_id):
+        return cls(match_id, load_events(match_id))
+
+    @staticmethod
+    def _index_types(types):
+        # statsbombpy groups events by type, so every type normally is one contiguous block
+        # which we can hand out as a slice (a view) rather than a copy
+        rows = {}
+        for ev_type in dict.fromkeys(types):
+            positions = np.flatnonzero(types == ev_type)
+            if positions[-1] - positions[0] + 1 == len(positions):
+                rows[ev_type] = slice(positions[0], positions[-1] + 1)
+            else:
+                rows[ev_type] = positions
+        return rows
+
+    @property
+    def nbytes(self):
+        # memory of the frames built so far, lazily computed ones included once they exist
+        return (sum(int(self.__dict__[name].memory_usage(deep=True).sum())
+                    for name in self.OWNED_FRAMES if name in self.__dict__)
+                + sizeof(self.__dict__.get('_derived', {})))
+
+    def of_type(self, ev_type):
+        return self.events.iloc[self._rows.get(ev_type, slice(0, 0))]
+
+    @cached_property
+    def passes(self):
+        return self.of_type('Pass')
+
+    @cached_property
+    def shots(self):
+        return self.of_type('Shot')
+
+    @cached_property
+    def pressures(self):
+        return self.of_type('Pressure')
+
+    @cached_property
+    def xT(self):
+        with preparing():
+            return freeze(xT_actions(self.events))
+
+    @cached_property
+    def lineups(self):
+        # who played when, see lineups.lineup_table
+        with preparing():
+            return freeze(lineup_table(self.events))
+
+    @cached_property
+    def _grids(self):
+        return {}
+
+    @cached_property
+    def _derived(self):
+        return {}
+
+    def derived(self, key, build):
+        # results other modules compute from this match (territories, hulls...), build(bundle) runs once
+        # per key; they live and go with the bundle and count towards its size in the match cache
+        if key not in self._derived:
+            with preparing():
+                self._derived[key] = build(self)
+        return self._derived[key]
+
+    def grid(self, team, action, bins, inverse=False):
+        # binned counts (xT sums) of a team's actions, as Pitch.bin_statistic returns them, so pitch.heatmap
+        # can draw it directly; binned once per match and resolution, the away side is the same grid reversed
+        key = (team, action, bins)
+        if key not in self._grids:
+            with preparing():
+                frame, x, y, values = GRID_ACTIONS[action]
+                df = getattr(self, frame)
+                df = df[df['team']==team]
+                statistic = _pitch().bin_statistic(df[x], df[y], values=None if values is None else df[values],
+                                                   statistic='count' if values is None else 'sum', bins=bins, normalize=False)['statistic']
+                statistic.flags.writeable = False
+                self._grids[key] = statistic
+        bin_statistic = grid_template(bins)
+        bin_statistic['statistic'] = self._grids[key][::-1, ::-1] if inverse else self._grids[key]
+        return bin_statistic
+
+
+class MatchCache(BoundedCache):
+    # match bundles shared by every session of the process within a byte budget; with disk=True the
+    # compact frames are also kept in the event store, which loads much faster than rebuilding them
+    # from the full statsbombpy frame
+
+    def __init__(self, max_bytes, policy='lru', disk=False):
+        super().__init__(max_bytes, policy, sizeof=lambda bundle: bundle.nbytes)
+        self.disk = disk
+        self.disk_hits = 0
+        self._loading = {}
+        self._loading_lock = threading.Lock()
+
+    def bundle(self, match_id):
+        bundle = self.get(match_id)
+        if bundle is not None:
+            return bundle
+        # one load per match even when several sessions ask for it at once
+        with self._loading_lock:
+            lock = self._loading.setdefault(match_id, threading.Lock())
+        with lock:
+            bundle = self._entries.get(match_id)
+            if bundle is None:
+                bundle = self._load(match_id)
+                # bundles cached earlier may have computed their xT or derived results since
+                for key in list(self._entries):
+                    self.resize(key)
+                self.put(match_id, bundle)
+        with self._loading_lock:
+            self._loading.pop(match_id, None)
+        return bundle
+
+    def _load(self, match_id):
+        name = f'compact/{int(match_id)}'
+        if self.disk:
+            stored = load_table(name)
+            # frames stored by an older compact_events are rebuilt and overwritten
+            if stored is not None and stored[1].get('version') == COMPACT_VERSION:
+                self.disk_hits += 1
+                # parquet keeps no type for a column without values, an empty category comes back as object
+                return MatchBundle(match_id, stored[0].astype(dict.fromkeys(CATEGORY_COLUMNS, 'category')),
+                                   compact=True)
+        bundle = MatchBundle.load(match_id)
+        if self.disk:
+            save_table(name, bundle.events, {'version': COMPACT_VERSION})
+        return bundle
+
+    def stats(self):
+        return {**super().stats(), 'disk': self.disk, 'disk_hits': self.disk_hits}
+
+
+match_cache = MatchCache(int(os.environ.get('EURO_MATCH_CACHE_MB', 512)) * 2**20,
+                         policy=os.environ.get('EURO_MATCH_CACHE_POLICY', 'lru'),
+                         disk=bool(os.environ.get('EURO_MATCH_CACHE_DISK')))
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+
+WINDOW_SIZE = 4         # minutes looked back
+DECAY_RATE = 0.25       # per minute
+XT_CLIP = (0, 0.1)
+# number of time bins per minute for every supported resolution
+RESOLUTIONS = {'minute': 1, 'second': 60}
+
+
+def decay_kernel(window_size=WINDOW_SIZE, decay_rate=DECAY_RATE, resolution='minute'):
+    per_minute = RESOLUTIONS[resolution]
+    lags = np.arange(int(round(window_size * per_minute)))
+    return np.exp(-decay_rate * lags / per_minute)
+
+
+def time_bins(actions, resolution='minute'):
+    if resolution == 'minute':
+        return actions['minute'].to_numpy(dtype=np.int64)
+    return actions['minute'].to_numpy(dtype=np.int64) * 60 + actions['second'].to_numpy(dtype=np.int64)
+
+
+def team_series(actions, teams, resolution='minute', length=None):
+    # dense (teams, time) array holding the highest clipped xT of each team in every time bin
+    bins = time_bins(actions, resolution)
+    team_idx = pd.Categorical(actions['team'], categories=teams).codes
+    keep = team_idx >= 0
+    length = (bins.max() + 1 if len(bins) else 0) if length is None else length
+    series = np.zeros((len(teams), length))
+    np.maximum.at(series, (team_idx[keep], bins[keep]), np.clip(actions['xT'].to_numpy()[keep], *XT_CLIP))
+    return series
+
+
+def decayed_sum(series, kernel):
+    # causal convolution along the last axis: out[t] = sum_k kernel[k] * series[t - k]
+    out = np.zeros_like(series)
+    length = series.shape[-1]
+    for lag, weight in enumerate(kernel[:length]):
+        out[..., lag:] += weight * series[..., :length - lag]
+    return out
+
+
+def _to_frame(curve, observed, resolution):
+    per_minute = RESOLUTIONS[resolution]
+    bins = np.flatnonzero(observed) if observed is not None else np.arange(len(curve))
+    return pd.DataFrame({'minute': bins / per_minute if per_minute > 1 else bins, 'momentum': curve[bins]})
+
+
+def momentum(actions, home_team, away_team, window_size=WINDOW_SIZE, decay_rate=DECAY_RATE,
+             resolution='minute', observed_only=True):
+    # home minus away exponentially weighted xT; by default only the time bins with at least
+    # one action are returned, otherwise the dense curve
+    return batch_momentum([(actions, home_team, away_team)], window_size, decay_rate,
+                          resolution, observed_only)[0]
+
+
+def batch_momentum(matches, window_size=WINDOW_SIZE, decay_rate=DECAY_RATE, resolution='minute',
+                   observed_only=True):
+    # matches: iterable of (xT actions, home team, away team); all curves come out of one
+    # convolution over a stacked (matches, teams, time) array
+    matches = list(matches)
+    if not matches:
+        return []
+    length = max(int(time_bins(actions, resolution).max(initial=-1)) + 1 for actions, _, _ in matches)
+    series = np.stack([team_series(actions, [home, away], resolution, length) for actions, home, away in matches])
+    weighted = decayed_sum(series, decay_kernel(window_size, decay_rate, resolution))
+    curves = weighted[:, 0] - weighted[:, 1]
+
+    frames = []
+    for (actions, _, _), curve in zip(matches, curves):
+        observed = None
+        if observed_only:
+            observed = np.zeros(length, dtype=bool)
+            observed[time_bins(actions, resolution)] = True
+        else:
+            curve = curve[:int(time_bins(actions, resolution).max(initial=-1)) + 1]
+        frames.append(_to_frame(curve, observed, resolution))
+    return frames
+
+
+class RunningMomentum:
+    # momentum of a match that is still being played: actions are added as they come in and only the
+    # time bins within one window after them are recomputed, with the same arithmetic as batch_momentum
+    # so that the curve ends up identical to the one of the complete match
+
+    def __init__(self, home_team, away_team, window_size=WINDOW_SIZE, decay_rate=DECAY_RATE, resolution='minute'):
+        self.teams = [home_team, away_team]
+        self.resolution = resolution
+        self.kernel = decay_kernel(window_size, decay_rate, resolution)
+        self.length = 0
+        self._series = np.zeros((2, 0))
+        self._weighted = np.zeros((2, 0))
+        self._observed = np.zeros(0, dtype=bool)
+
+    def _reserve(self, length):
+        # grows the arrays by doubling so a match costs O(log minutes) reallocations
+        capacity = self._series.shape[1]
+        if length <= capacity:
+            return
+        capacity = max(length, 2 * capacity, 128 * RESOLUTIONS[self.resolution])
+        grow = capacity - self._series.shape[1]
+        self._series = np.pad(self._series, ((0, 0), (0, grow)))
+        self._weighted = np.pad(self._weighted, ((0, 0), (0, grow)))
+        self._observed = np.pad(self._observed, (0, grow))
+
+    def add(self, actions):
+        # actions: new rows of xT actions (team, minute, second, xT); O(new actions + window)
+        if not len(actions):
+            return
+        bins = time_bins(actions, self.resolution)
+        self._reserve(int(bins.max()) + len(self.kernel))
+        self._observed[bins] = True
+        self.length = max(self.length, int(bins.max()) + 1)
+        team_idx = pd.Categorical(actions['team'], categories=self.teams).codes
+        keep = team_idx >= 0
+        np.maximum.at(self._series, (team_idx[keep], bins[keep]), np.clip(actions['xT'].to_numpy()[keep], *XT_CLIP))
+
+        start, end = int(bins.min()), int(bins.max()) + 1
+        # every bin the changed ones reach through the kernel, summed lag by lag like decayed_sum
+        stop = end + len(self.kernel) - 1
+        out = np.zeros((2, stop - start))
+        for lag, weight in enumerate(self.kernel):
+            lo = max(start, lag)
+            out[:, lo - start:] += weight * self._series[:, lo - lag:stop - lag]
+        self._weighted[:, start:stop] = out
+
+    def frame(self, observed_only=True):
+        # the curve momentum() returns for all actions added so far
+        curve = self._weighted[0, :self.length] - self._weighted[1, :self.length]
+        return _to_frame(curve, self._observed[:self.length] if observed_only else None, self.resolution)
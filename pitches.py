@@ -0,0 +1,60 @@
+import threading
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PathCollection
+from matplotlib.figure import Figure
+from mplsoccer.pitch import Pitch, VerticalPitch
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+class PitchTemplate:
+    # a pitch drawn once and kept as the paths of its markings in data coordinates, grouped by style;
+    # putting it on a panel takes a few collections instead of the ~20 lines and patches Pitch.draw
+    # creates, most of whose cost is matplotlib updating the data limits the pitch then overrides
+
+    def __init__(self, pitch):
+        self.pitch = pitch
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        pitch.draw(ax=ax)
+        # arcs settle their stretched angles when drawn
+        fig.canvas.draw()
+
+        self.groups = {}
+        for line in ax.lines:
+            style = (('edgecolors', line.get_color()), ('facecolors', 'none'), ('linewidths', line.get_linewidth()),
+                     ('linestyles', line.get_linestyle()), ('capstyle', line.get_solid_capstyle()),
+                     ('joinstyle', line.get_solid_joinstyle()), ('alpha', line.get_alpha()), ('zorder', line.get_zorder()))
+            self.groups.setdefault(style, []).append(line.get_path())
+        for patch in ax.patches:
+            style = (('edgecolors', tuple(patch.get_edgecolor())),
+                     ('facecolors', tuple(patch.get_facecolor()) if patch.get_fill() else 'none'),
+                     ('linewidths', patch.get_linewidth()), ('linestyles', patch.get_linestyle()),
+                     ('capstyle', patch.get_capstyle()), ('joinstyle', patch.get_joinstyle()),
+                     ('alpha', patch.get_alpha()), ('zorder', patch.get_zorder()))
+            self.groups.setdefault(style, []).append(patch.get_patch_transform().transform_path(patch.get_path()))
+
+    def draw(self, ax):
+        # the axes setup of Pitch.draw, then the markings
+        self.pitch._set_axes(ax)
+        self.pitch._set_background(ax)
+        for style, paths in self.groups.items():
+            ax.add_collection(PathCollection(paths, **dict(style)), autolim=False)
+        return self.pitch
+
+
+def draw_pitch(ax, vertical=False, **kwargs):
+    # draws a Pitch (VerticalPitch) built with kwargs onto ax and returns it for plotting on top;
+    # pitches are shared between panels, so they must not be changed
+    key = (vertical, tuple(sorted(kwargs.items())))
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                template = _templates[key] = PitchTemplate((VerticalPitch if vertical else Pitch)(**kwargs))
+    return template.draw(ax)
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext, contextmanager
+
+
+# records of every profiled dashboard are appended here (JSON lines) when set
+PROFILE_LOG = os.environ.get('EURO_PROFILE_LOG')
+# fetch: loading the match bundle, prepare: the match data the panels compute once and share (a bundle's
+# xT, lineups, grids and derived results, tournament partials, densities), reached through preparing(),
+# build: the rest of the viz function (its own filtering and the artists), plot: rasterizing the figure
+# into its tile, encode: writing the downloaded file (PNG encoding, savefig for the vector formats)
+PHASES = ('fetch', 'prepare', 'build', 'plot', 'encode')
+
+# the profile whose phase is running in this thread, for preparing()
+_current = threading.local()
+
+
+class _NoProfile:
+    # stands in when profiling is off so the render path only pays for entering a null context
+    _null = nullcontext()
+
+    def phase(self, name):
+        return self._null
+
+    def record(self):
+        return None
+
+
+NO_PROFILE = _NoProfile()
+
+
+def preparing():
+    # wraps shared data preparation, so that when it runs inside a profiled phase its time and memory go
+    # to 'prepare' instead; only a thread local lookup when nothing is profiled
+    profile = getattr(_current, 'profile', None)
+    return profile.phase('prepare') if profile is not None else _NoProfile._null
+
+
+class PanelProfile:
+    # wall time and peak traced memory of every phase of one panel
+
+    def __init__(self, panel, memory=True):
+        self.panel = panel
+        self.memory = memory
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.kib = dict.fromkeys(PHASES, 0.0)
+        self._open = []
+        # tracing slows python down a lot, so it only runs while a profiled panel is drawn
+        self._tracing = memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def _peak(self, name, base):
+        self.kib[name] = max(self.kib[name], (tracemalloc.get_traced_memory()[1] - base) / 1024)
+
+    @contextmanager
+    def phase(self, name):
+        # a phase opened inside another one is taken out of the outer phase's time
+        outer = self._open[-1] if self._open else None
+        if self.memory:
+            if outer is not None:
+                self._peak(*outer)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        self._open.append((name, base if self.memory else 0))
+        previous, _current.profile = getattr(_current, 'profile', None), self
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.profile = previous
+            self._open.pop()
+            self.seconds[name] += elapsed
+            if outer is not None:
+                self.seconds[outer[0]] -= elapsed
+            if self.memory:
+                self._peak(name, base)
+                # the outer phase's peak goes on from here
+                tracemalloc.reset_peak()
+
+    def record(self):
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        record = {'panel': self.panel, 'cached': False, 'pid': os.getpid()}
+        record.update({f'{name}_s': self.seconds[name] for name in PHASES})
+        if self.memory:
+            record.update({f'{name}_kib': self.kib[name] for name in PHASES})
+        return record
+
+
+class DashboardProfile:
+    # collects the panel records of one dashboard, including the ones rendered in worker processes
+
+    def __init__(self, match_id, memory=True):
+        self.match_id = match_id
+        self.memory = memory
+        self.records = []
+        self.started = time.time()
+
+    def panel(self, panel):
+        return PanelProfile(panel, self.memory)
+
+    def add(self, record, **extra):
+        self.records.append({'match_id': int(self.match_id), **record, **extra})
+
+    def add_cached(self, panel, **extra):
+        self.add({'panel': panel, 'cached': True, **{f'{name}_s': 0.0 for name in PHASES}}, **extra)
+
+    def table(self):
+        # one row per panel plus a total, seconds and KiB rounded for display
+        import pandas as pd
+        df = pd.DataFrame(self.records)
+        seconds = [f'{name}_s' for name in PHASES]
+        kib = [f'{name}_kib' for name in PHASES if f'{name}_kib' in df.columns]
+        df['total_s'] = df[seconds].sum(axis=1)
+        total = df[seconds + ['total_s']].sum().to_frame().T.assign(panel='Total')
+        df = pd.concat([df, total], ignore_index=True)
+        return df[['panel', 'column', 'cached'] + seconds + ['total_s'] + kib].round(3)
+
+    def write(self, path=PROFILE_LOG):
+        if not path:
+            return
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps({'time': self.started, **record}) + '\n')
@@ -0,0 +1,284 @@
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+
+from auxiliary import country_colors, fetch_match_bundle
+from cache import BoundedCache
+from get_viz import viz_dict
+from profiling import NO_PROFILE, PanelProfile
+
+
+BACKGROUND = '#0e1117'
+PREVIEW_DPI = 100
+DASHBOARD_WIDTH = 25
+FEDERATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'federations')
+# panels missing from the cache are drawn in this many worker processes, 0 or 1 renders in-process
+RENDER_WORKERS = int(os.environ.get('EURO_RENDER_WORKERS', 0))
+# downloads: file extension and mime type of every format, and the resolutions offered
+EXPORT_FORMATS = {'PNG': ('png', 'image/png'), 'SVG': ('svg', 'image/svg+xml'), 'PDF': ('pdf', 'application/pdf')}
+EXPORT_DPIS = (100, 150, 200, 300)
+EXPORT_DPI = 150
+
+
+class TileCache(BoundedCache):
+    # rendered panels (RGBA arrays), bounded by the total number of bytes held
+
+    def put(self, key, tile):
+        tile.flags.writeable = False
+        super().put(key, tile)
+
+
+tile_cache = TileCache(int(os.environ.get('EURO_TILE_CACHE_MB', 256)) * 2**20)
+
+
+def draw_panel(viz_name, match_id, home_team, away_team, column, ax):
+    # the middle column shows both teams, the left one the home side and the right one the away side
+    if column == 1:
+        viz_dict[viz_name](match_id, home_team, away_team, ax)
+        if viz_name == 'xG Flow':
+            ax.set_xlabel('Minute',fontname='Monospace',color='white',fontsize=16)
+            ax.set_ylabel('xG',fontname='Monospace',color='white',fontsize=16)
+    elif column == 0:
+        viz_dict[viz_name](match_id, home_team, ax)
+    elif column == 2:
+        viz_dict[viz_name](match_id, away_team, ax, inverse=True)
+
+
+def draw_header(home_team, away_team, home_score, away_score, axes):
+    for ax in axes:
+        ax.patch.set_facecolor(BACKGROUND)
+        ax.axis('off')
+
+    axes[0].imshow(Image.open(os.path.join(FEDERATIONS_DIR, f'{home_team}.png')))
+    axes[2].imshow(Image.open(os.path.join(FEDERATIONS_DIR, f'{away_team}.png')))
+
+    home_team_text = axes[1].text(0.2, 0.4, home_team, fontsize=30, ha='center', fontfamily="Monospace", fontweight='bold', color='white')
+    home_team_text.set_bbox(dict(facecolor=country_colors[home_team], alpha=0.5, edgecolor='white', boxstyle='round'))
+    away_team_text = axes[1].text(0.8, 0.4, away_team, fontsize=30, ha='center', fontfamily="Monospace", fontweight='bold', color='white')
+    away_team_text.set_bbox(dict(facecolor=country_colors[away_team], alpha=0.5, edgecolor='white', boxstyle='round'))
+    axes[1].text(0.5, 0, f'{home_score} - {away_score}', fontsize=40, ha='center',
+                 fontfamily="Monospace", fontweight='bold', color='white')
+
+
+def _split(total, weights):
+    # integer pixel sizes proportional to weights that add up exactly to total
+    edges = np.round(np.cumsum([0] + list(weights)) / sum(weights) * total).astype(int)
+    return list(np.diff(edges))
+
+
+def dashboard_geometry(n_rows, dpi=PREVIEW_DPI):
+    # n_rows includes the header row; same proportions as the original 25 inch wide figure
+    fig_height = 10 + 5 * (n_rows - 2)
+    row_heights = _split(round(fig_height * dpi), [1] + [2 for _ in range(n_rows-1)])
+    col_widths = _split(round(DASHBOARD_WIDTH * dpi), [1, 1, 1])
+    return row_heights, col_widths
+
+
+def _figure(size, dpi):
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi, constrained_layout=True)
+    FigureCanvasAgg(fig)
+    fig.patch.set_facecolor(BACKGROUND)
+    return fig
+
+
+def _to_tile(fig, size):
+    # copies the drawn canvas into a tile of exactly size pixels
+    buffer = np.asarray(fig.canvas.buffer_rgba())
+    tile = np.empty((size[1], size[0], 4), dtype=np.uint8)
+    tile[:] = np.array(to_rgba(BACKGROUND)) * 255
+    h, w = min(size[1], buffer.shape[0]), min(size[0], buffer.shape[1])
+    tile[:h, :w] = buffer[:h, :w]
+    return tile
+
+
+def render_panel(viz_name, match_id, home_team, away_team, column, size, dpi=PREVIEW_DPI, profile=NO_PROFILE):
+    # size is (width, height) in pixels
+    with profile.phase('fetch'):
+        fetch_match_bundle(match_id)
+    with profile.phase('build'):
+        fig = _figure(size, dpi)
+        ax = fig.add_subplot()
+        ax.patch.set_facecolor(BACKGROUND)
+        ax.axis('off')
+        draw_panel(viz_name, match_id, home_team, away_team, column, ax)
+    with profile.phase('plot'):
+        fig.canvas.draw()
+        return _to_tile(fig, size)
+
+
+def render_live_panel(live, viz_name, size, dpi=PREVIEW_DPI, profile=NO_PROFILE):
+    # a panel of a match followed as it is played, drawn from the running state of a live.LiveMatch
+    with profile.phase('build'):
+        fig = _figure(size, dpi)
+        ax = fig.add_subplot()
+        ax.patch.set_facecolor(BACKGROUND)
+        ax.axis('off')
+        live.draw(viz_name, ax)
+    with profile.phase('plot'):
+        fig.canvas.draw()
+        return _to_tile(fig, size)
+
+
+def render_header(home_team, away_team, home_score, away_score, size, dpi=PREVIEW_DPI, profile=NO_PROFILE):
+    with profile.phase('build'):
+        fig = _figure(size, dpi)
+        gs = fig.add_gridspec(nrows=1, ncols=3)
+        draw_header(home_team, away_team, home_score, away_score, [fig.add_subplot(gs[0, j]) for j in range(3)])
+    with profile.phase('plot'):
+        fig.canvas.draw()
+        return _to_tile(fig, size)
+
+
+def panel_key(viz_name, match_id, home_team, away_team, column, size, dpi):
+    team = (home_team, away_team) if column == 1 else home_team if column == 0 else away_team
+    return (viz_name, match_id, team, column == 2, size, dpi)
+
+
+def header_key(match_id, home_team, away_team, home_score, away_score, size, dpi):
+    return ('Header', match_id, (home_team, away_team), (home_score, away_score), size, dpi)
+
+
+_pool, _pool_workers = None, 0
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers):
+    # one long-lived pool per process; spawned rather than forked since streamlit runs scripts in threads
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _render_job(job):
+    # returns (tile, profile record or None); the profile is made where the panel is drawn,
+    # memory is None when not profiling, otherwise whether to trace allocations
+    kind, args, memory = job
+    profile = PanelProfile('Header' if kind == 'header' else args[0], memory) if memory is not None else NO_PROFILE
+    tile = render_header(*args, profile=profile) if kind == 'header' else render_panel(*args, profile=profile)
+    return tile, profile.record()
+
+
+def render_tiles(jobs, workers=RENDER_WORKERS):
+    # every panel is independent, so they can be drawn in separate processes;
+    # a tile depends only on its job so the result is the same as rendering serially
+    if workers > 1 and len(jobs) > 1:
+        return list(get_pool(workers).map(_render_job, jobs))
+    return [_render_job(job) for job in jobs]
+
+
+def render_dashboard(match_id, home_team, away_team, home_score, away_score, selected_options,
+                     dpi=PREVIEW_DPI, cache=tile_cache, workers=RENDER_WORKERS, profiler=None):
+    # selected_options is the grid from the creator menu, row 0 is the header and 'None' an empty cell;
+    # every panel comes from the tile cache so changing one cell only renders that cell.
+    # profiler: a profiling.DashboardProfile collecting a record for every cell
+    row_heights, col_widths = dashboard_geometry(len(selected_options), dpi)
+    profiled = profiler is not None
+    memory = profiler.memory if profiled else None
+
+    header_size = (sum(col_widths), row_heights[0])
+    cells = [(header_key(match_id, home_team, away_team, home_score, away_score, header_size, dpi), (0, 0),
+              ('header', (home_team, away_team, home_score, away_score, header_size, dpi), memory))]
+    top = row_heights[0]
+    for i in range(1, len(selected_options)):
+        left = 0
+        for j in range(3):
+            size = (col_widths[j], row_heights[i])
+            viz_name = selected_options[i][j]
+            if viz_name not in (None, 'None'):
+                cells.append((panel_key(viz_name, match_id, home_team, away_team, j, size, dpi), (top, left),
+                              ('panel', (viz_name, match_id, home_team, away_team, j, size, dpi), memory)))
+            left += size[0]
+        top += row_heights[i]
+
+    tiles = {key: cache.get(key) for key, _, _ in cells}
+    missing = list({key: job for key, _, job in cells if tiles[key] is None}.items())
+    for (key, job), (tile, record) in zip(missing, render_tiles([job for _, job in missing], workers)):
+        cache.put(key, tile)
+        tiles[key] = tile
+        if profiled:
+            profiler.add(record, column=job[1][4] if job[0] == 'panel' else None)
+    if profiled:
+        rendered = {key for key, _ in missing}
+        for key, _, (kind, args, _) in cells:
+            if key not in rendered:
+                profiler.add_cached('Header' if kind == 'header' else args[0],
+                                    column=args[4] if kind == 'panel' else None)
+
+    canvas = np.empty((sum(row_heights), sum(col_widths), 4), dtype=np.uint8)
+    canvas[:] = np.array(to_rgba(BACKGROUND)) * 255
+    for key, (top, left), _ in cells:
+        tile = tiles[key]
+        canvas[top:top + tile.shape[0], left:left + tile.shape[1]] = tile
+    return canvas
+
+
+def encode_png(dashboard):
+    buf = io.BytesIO()
+    Image.fromarray(dashboard).save(buf, format='png')
+    return buf.getvalue()
+
+
+def dashboard_figure(match_id, home_team, away_team, home_score, away_score, selected_options, dpi=EXPORT_DPI):
+    # the whole dashboard as one figure for the vector formats; every cell is a subfigure laid out on
+    # its own like its tile, so the result looks like the preview
+    row_heights, col_widths = dashboard_geometry(len(selected_options), dpi)
+    fig = Figure(figsize=(sum(col_widths) / dpi, sum(row_heights) / dpi), dpi=dpi, constrained_layout=True,
+                 facecolor=BACKGROUND)
+    FigureCanvasAgg(fig)
+    rows = fig.subfigures(len(selected_options), 1, height_ratios=row_heights, wspace=0, hspace=0,
+                         facecolor=BACKGROUND)
+
+    header = rows[0]
+    gs = header.add_gridspec(nrows=1, ncols=3)
+    draw_header(home_team, away_team, home_score, away_score, [header.add_subplot(gs[0, j]) for j in range(3)])
+    for i in range(1, len(selected_options)):
+        cells = rows[i].subfigures(1, 3, width_ratios=col_widths, wspace=0, hspace=0, facecolor=BACKGROUND)
+        for j, cell in enumerate(cells):
+            viz_name = selected_options[i][j]
+            if viz_name in (None, 'None'):
+                continue
+            ax = cell.add_subplot()
+            ax.patch.set_facecolor(BACKGROUND)
+            ax.axis('off')
+            draw_panel(viz_name, match_id, home_team, away_team, j, ax)
+    return fig
+
+
+def export_dashboard(match_id, home_team, away_team, home_score, away_score, selected_options, format='PNG',
+                     dpi=EXPORT_DPI, workers=RENDER_WORKERS, profiler=None):
+    # the file behind the download button, only made when it is asked for; PNG is composed from tiles
+    # like the preview, just at the export resolution and without filling the preview's tile cache.
+    # profiler: a profiling.DashboardProfile, gets a record for every tile and one for the file
+    if format == 'PNG':
+        dashboard = render_dashboard(match_id, home_team, away_team, home_score, away_score, selected_options,
+                                     dpi=dpi, cache=TileCache(0), workers=workers, profiler=profiler)
+        profile = profiler.panel(format) if profiler is not None else NO_PROFILE
+        with profile.phase('encode'):
+            data = encode_png(dashboard)
+    else:
+        profile = profiler.panel(format) if profiler is not None else NO_PROFILE
+        with profile.phase('fetch'):
+            fetch_match_bundle(match_id)
+        with profile.phase('build'):
+            fig = dashboard_figure(match_id, home_team, away_team, home_score, away_score, selected_options, dpi)
+        # the vector backends draw the artists while writing the file
+        with profile.phase('encode'):
+            buf = io.BytesIO()
+            fig.savefig(buf, format=EXPORT_FORMATS[format][0], dpi=dpi, facecolor=BACKGROUND)
+            data = buf.getvalue()
+    if profiler is not None:
+        profiler.add(profile.record(), column=None, dpi=dpi)
+    return data
@@ -0,0 +1,313 @@
+# Synthetic Euro 2024 style event data with the same shape as StatsBomb's open data, for benchmarks
+# and load tests that must not depend on the real endpoint or on a single real match.
+#
+#   python synthetic.py generate <dir> [--matches 51] [--minutes 95] [--density 20]
+#   python synthetic.py serve <dir> [--port 8000]
+#   python synthetic.py replay <dir> <match_id> <feed.jsonl> [--speed 60]
+#
+# generate writes <dir>/events/<match_id>.json and <dir>/matches/55/282.json (plus competitions.json);
+# use it directly with EURO_OFFLINE_DATA=<dir>, or serve it over HTTP and run the app with
+# EURO_OPEN_DATA_URL=http://127.0.0.1:8000 so the whole statsbombpy download path is exercised.
+# replay appends the events of a match to a JSON lines feed as if it was being played, speed times
+# faster than real time, for following it with live.py (put the feed under a served <dir> for HTTP)
+import argparse
+import functools
+import json
+import os
+import time
+import uuid
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from auxiliary import country_colors
+
+
+COMPETITION_ID, SEASON_ID = 55, 282
+
+# (position name, position id, mean x, mean y) in the team's own attacking frame
+FORMATION = [
+    ('Goalkeeper', 1, 10, 40),
+    ('Right Back', 2, 40, 70),
+    ('Right Center Back', 3, 28, 55),
+    ('Left Center Back', 5, 28, 25),
+    ('Left Back', 6, 40, 10),
+    ('Right Defensive Midfield', 9, 50, 50),
+    ('Left Defensive Midfield', 11, 50, 30),
+    ('Right Wing', 17, 85, 70),
+    ('Center Attacking Midfield', 19, 75, 40),
+    ('Left Wing', 21, 85, 10),
+    ('Center Forward', 23, 100, 40),
+]
+SHOT_OUTCOMES = ['Blocked', 'Goal', 'Off T', 'Post', 'Saved', 'Wayward', 'Saved Off T', 'Saved to Post']
+SHOT_OUTCOME_P = [0.25, 0.0, 0.3, 0.02, 0.25, 0.12, 0.03, 0.03]
+
+
+def _named(id_, name):
+    return {'id': int(id_), 'name': name}
+
+
+def _timestamp(minute, second, period):
+    offset = 0 if period == 1 else 45
+    minute = max(minute - offset, 0)
+    return f'00:{minute:02d}:{second:02d}.000' if minute < 60 else f'01:{minute-60:02d}:{second:02d}.000'
+
+
+def _squad(team, team_id):
+    players = []
+    for k in range(18):
+        players.append(_named(team_id * 100 + k, f'{team} Player{k+1} {team[:3]}{k+1}'))
+    return players
+
+
+def generate_match_events(match_id, home_team, away_team, minutes=95, density=20.0, seed=None):
+    # raw events of one match as the open-data JSON has them; density is on-ball actions per minute
+    # (passes, carries, pressures and shots, receipts and substitutions come on top)
+    rng = np.random.default_rng(match_id if seed is None else seed)
+    teams = [(home_team, 1000 + sorted(country_colors).index(home_team)),
+             (away_team, 1000 + sorted(country_colors).index(away_team))]
+    squads = {name: _squad(name, team_id) for name, team_id in teams}
+    on_pitch = {name: list(range(11)) for name, _ in teams}
+    events = []
+
+    def add(minute, second, period, type_id, type_name, team, **fields):
+        name, team_id = team
+        ev = {
+            'id': str(uuid.UUID(int=int(rng.integers(0, 2**63)) << 64 | len(events))),
+            'index': len(events) + 1,
+            'period': period,
+            'timestamp': _timestamp(minute, second, period),
+            'minute': int(minute),
+            'second': int(second),
+            'type': _named(type_id, type_name),
+            'possession': 1 + len(events) // 6,
+            'possession_team': _named(team_id, name),
+            'play_pattern': _named(1, 'Regular Play'),
+            'team': _named(team_id, name),
+        }
+        ev.update(fields)
+        events.append(ev)
+        return ev
+
+    for team in teams:
+        lineup = [{'player': squads[team[0]][k], 'position': _named(FORMATION[k][1], FORMATION[k][0]),
+                   'jersey_number': k + 1} for k in range(11)]
+        add(0, 0, 1, 35, 'Starting XI', team, duration=0.0, tactics={'formation': 4231, 'lineup': lineup})
+    for team in teams:
+        add(0, 0, 1, 18, 'Half Start', team, duration=0.0)
+
+    # substitutions: mostly after the break, occasionally an early injury one
+    subs = []
+    for t, team in enumerate(teams):
+        times = sorted(rng.integers(55, min(minutes, 88), size=rng.integers(3, 6)))
+        if rng.random() < 0.2:
+            times = [int(rng.integers(10, 29))] + list(times)
+        outs = rng.choice(np.arange(1, 11), size=len(times), replace=False)
+        for n, (minute, out) in enumerate(zip(times, outs)):
+            subs.append((int(minute), int(rng.integers(0, 60)), t, int(out), 11 + n))
+    subs.sort()
+
+    own_goals = [(int(rng.integers(1, minutes)), int(rng.integers(0, 60)), int(rng.integers(0, 2)))
+                 for _ in range(int(rng.random() < 0.1))]
+
+    n_actions = int(density * minutes)
+    stamps = np.sort(rng.uniform(0, minutes * 60, size=n_actions))
+    sub_idx = 0
+    for stamp in stamps:
+        minute, second = int(stamp // 60), int(stamp % 60)
+        period = 1 if minute < 45 else 2
+        while sub_idx < len(subs) and (subs[sub_idx][0], subs[sub_idx][1]) <= (minute, second):
+            s_min, s_sec, t, out, into = subs[sub_idx]
+            squad = squads[teams[t][0]]
+            slot = on_pitch[teams[t][0]].index(out) if out in on_pitch[teams[t][0]] else 1
+            leaving = on_pitch[teams[t][0]][slot]
+            on_pitch[teams[t][0]][slot] = into
+            add(s_min, s_sec, 1 if s_min < 45 else 2, 19, 'Substitution', teams[t],
+                player=squad[leaving], position=_named(FORMATION[slot][1], FORMATION[slot][0]),
+                substitution={'outcome': _named(103, 'Tactical'), 'replacement': squad[into]})
+            sub_idx += 1
+
+        t = int(rng.random() < 0.48)
+        team = teams[t]
+        squad = squads[team[0]]
+        slot = int(rng.integers(0, 11))
+        player = squad[on_pitch[team[0]][slot]]
+        pos_name, pos_id, mx, my = FORMATION[slot]
+        x = float(np.clip(rng.normal(mx, 12), 0.1, 119.9))
+        y = float(np.clip(rng.normal(my, 10), 0.1, 79.9))
+        base = dict(player=player, position=_named(pos_id, pos_name), location=[round(x, 1), round(y, 1)])
+        kind = rng.random()
+
+        if kind < 0.52:
+            dx, dy = rng.normal(6, 14), rng.normal(0, 14)
+            ex, ey = float(np.clip(x + dx, 0.1, 119.9)), float(np.clip(y + dy, 0.1, 79.9))
+            recipient_slot = int(rng.integers(0, 11))
+            attrs = {}
+            complete = rng.random() < 0.82
+            if complete:
+                attrs['recipient'] = squad[on_pitch[team[0]][recipient_slot]]
+            attrs.update({
+                'length': float(np.hypot(ex - x, ey - y)),
+                'angle': float(np.arctan2(ey - y, ex - x)),
+                'height': _named(1, 'Ground Pass'),
+                'end_location': [round(ex, 1), round(ey, 1)],
+                'body_part': _named(40, 'Right Foot'),
+            })
+            if not complete:
+                attrs['outcome'] = _named(9, 'Incomplete')
+            add(minute, second, period, 30, 'Pass', team, duration=float(rng.uniform(0.3, 2.5)),
+                **base, **{'pass': attrs})
+            if complete:
+                add(minute, second, period, 42, 'Ball Receipt*', team, player=attrs['recipient'],
+                    location=[round(ex, 1), round(ey, 1)])
+        elif kind < 0.82:
+            ex = float(np.clip(x + rng.normal(4, 6), 0.1, 119.9))
+            ey = float(np.clip(y + rng.normal(0, 6), 0.1, 79.9))
+            add(minute, second, period, 43, 'Carry', team, duration=float(rng.uniform(0.5, 4)),
+                **base, carry={'end_location': [round(ex, 1), round(ey, 1)]})
+        elif kind < 0.985:
+            add(minute, second, period, 17, 'Pressure', team, duration=float(rng.uniform(0.2, 1.5)),
+                **base, counterpress=bool(rng.random() < 0.2))
+        else:
+            sx = float(rng.uniform(88, 118))
+            sy = float(np.clip(rng.normal(40, 9), 18, 62))
+            distance = np.hypot(120 - sx, 40 - sy)
+            xg = float(np.clip(np.exp(-distance / 9) * rng.uniform(0.5, 1.5), 0.01, 0.95))
+            outcome = 'Goal' if rng.random() < xg else str(rng.choice(SHOT_OUTCOMES, p=SHOT_OUTCOME_P))
+            shot = {
+                'statsbomb_xg': xg,
+                'end_location': [120.0, round(float(rng.uniform(36, 44)), 1), round(float(rng.uniform(0, 2.5)), 1)],
+                'outcome': _named(SHOT_OUTCOMES.index(outcome) + 96, outcome),
+                'type': _named(87, 'Open Play'),
+                'body_part': _named(40, 'Right Foot'),
+                'technique': _named(93, 'Normal'),
+            }
+            add(minute, second, period, 16, 'Shot', team, duration=float(rng.uniform(0.1, 1)),
+                player=player, position=base['position'], location=[round(sx, 1), round(sy, 1)], shot=shot)
+
+        for og in list(own_goals):
+            if (og[0], og[1]) <= (minute, second):
+                against, scored_for = teams[og[2]], teams[1 - og[2]]
+                add(og[0], og[1], period, 20, 'Own Goal Against', against,
+                    player=squads[against[0]][on_pitch[against[0]][2]])
+                add(og[0], og[1], period, 25, 'Own Goal For', scored_for)
+                own_goals.remove(og)
+
+    for team in teams:
+        add(minutes, 0, 2, 34, 'Half End', team, duration=0.0)
+    return events
+
+
+def match_score(events, team):
+    goals = sum(1 for ev in events if ev['type']['name'] == 'Shot' and ev['team']['name'] == team
+                and ev['shot']['outcome']['name'] == 'Goal')
+    goals += sum(1 for ev in events if ev['type']['name'] == 'Own Goal For' and ev['team']['name'] == team)
+    return goals
+
+
+def generate_open_data(root, n_matches=51, minutes=95, density=20.0, first_match_id=4000000, seed=0):
+    rng = np.random.default_rng(seed)
+    teams = sorted(country_colors)
+    os.makedirs(os.path.join(root, 'events'), exist_ok=True)
+    os.makedirs(os.path.join(root, 'matches', str(COMPETITION_ID)), exist_ok=True)
+
+    matches = []
+    for n in range(n_matches):
+        match_id = first_match_id + n
+        home, away = rng.choice(teams, size=2, replace=False)
+        events = generate_match_events(match_id, str(home), str(away), minutes=minutes, density=density)
+        with open(os.path.join(root, 'events', f'{match_id}.json'), 'w') as f:
+            json.dump(events, f)
+
+        home_id, away_id = events[0]['team']['id'], events[1]['team']['id']
+        matches.append({
+            'match_id': match_id,
+            'match_date': f'2024-06-{14 + n % 17:02d}',
+            'kick_off': '21:00:00.000',
+            'competition': {'competition_id': COMPETITION_ID, 'country_name': 'Europe', 'competition_name': 'UEFA Euro'},
+            'season': {'season_id': SEASON_ID, 'season_name': '2024'},
+            'home_team': {'home_team_id': home_id, 'home_team_name': str(home), 'home_team_gender': 'male',
+                          'home_team_group': None, 'country': {'id': home_id, 'name': str(home)}, 'managers': []},
+            'away_team': {'away_team_id': away_id, 'away_team_name': str(away), 'away_team_gender': 'male',
+                          'away_team_group': None, 'country': {'id': away_id, 'name': str(away)}, 'managers': []},
+            'home_score': match_score(events, str(home)),
+            'away_score': match_score(events, str(away)),
+            'match_status': 'available',
+            'match_status_360': 'available',
+            'last_updated': '2024-07-15T12:00:00.000000',
+            'last_updated_360': '2024-07-15T12:00:00.000000',
+            'metadata': {'data_version': '1.1.0', 'shot_fidelity_version': '2', 'xy_fidelity_version': '2'},
+            'match_week': 1 + n // 12,
+            'competition_stage': _named(10, 'Group Stage'),
+            'stadium': _named(1, 'Synthetic Arena'),
+            'referee': _named(1, 'Synthetic Referee'),
+        })
+    with open(os.path.join(root, 'matches', str(COMPETITION_ID), f'{SEASON_ID}.json'), 'w') as f:
+        json.dump(matches, f)
+    with open(os.path.join(root, 'competitions.json'), 'w') as f:
+        json.dump([{'competition_id': COMPETITION_ID, 'season_id': SEASON_ID, 'country_name': 'Europe',
+                    'competition_name': 'UEFA Euro', 'competition_gender': 'male', 'competition_youth': False,
+                    'competition_international': True, 'season_name': '2024'}], f)
+    return matches
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_open_data(root, host='127.0.0.1', port=8000, verbose=False):
+    # stand-in for raw.githubusercontent.com/statsbomb/open-data/master/data, serving root as is
+    handler = SimpleHTTPRequestHandler if verbose else _QuietHandler
+    server = ThreadingHTTPServer((host, port), functools.partial(handler, directory=root))
+    print(f'serving {root} on http://{host}:{server.server_port}', flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def replay_match(root, match_id, feed, speed=60.0, batch=1.0):
+    # every batch seconds of match time is appended at once, the events of a period on a single clock
+    with open(os.path.join(root, 'events', f'{match_id}.json'), encoding='utf-8') as f:
+        events = json.load(f)
+    start = time.monotonic()
+    with open(feed, 'w', encoding='utf-8') as out:
+        for i, ev in enumerate(events):
+            clock = ev['minute'] * 60 + ev['second']
+            delay = start + clock / speed - time.monotonic()
+            if delay > 0 and (i == 0 or clock // batch != (events[i - 1]['minute'] * 60 + events[i - 1]['second']) // batch):
+                out.flush()
+                time.sleep(delay)
+            out.write(json.dumps(ev) + '\n')
+    return len(events)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate and serve synthetic StatsBomb open-data.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate')
+    generate.add_argument('root')
+    generate.add_argument('--matches', type=int, default=51)
+    generate.add_argument('--minutes', type=int, default=95)
+    generate.add_argument('--density', type=float, default=20.0)
+    generate.add_argument('--seed', type=int, default=0)
+    serve = commands.add_parser('serve')
+    serve.add_argument('root')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--verbose', action='store_true')
+    replay = commands.add_parser('replay')
+    replay.add_argument('root')
+    replay.add_argument('match_id', type=int)
+    replay.add_argument('feed')
+    replay.add_argument('--speed', type=float, default=60.0, help='match seconds per real second')
+    replay.add_argument('--batch', type=float, default=1.0, help='match seconds written at once')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate_open_data(args.root, args.matches, args.minutes, args.density, seed=args.seed)
+    elif args.command == 'serve':
+        serve_open_data(args.root, args.host, args.port, args.verbose)
+    else:
+        replay_match(args.root, args.match_id, args.feed, args.speed, args.batch)
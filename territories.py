@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from mplsoccer.pitch import Pitch
+from scipy.spatial import ConvexHull, QhullError
+
+import lineups
+from auxiliary import fetch_match_bundle
+
+
+# actions further than this many standard deviations from a player's mean location, in both x and y,
+# are left out of their territory
+HULL_ZSCORE = 0.75
+# minute the clock shows when a period kicks off: halves, extra time halves and the shootout
+KICK_OFF_MINUTES = {1: 0, 2: 45, 3: 90, 4: 105, 5: 120}
+
+_pitch = Pitch(pitch_type='statsbomb')
+
+
+def _located_events(bundle):
+    # every event with a player and a location, on the clock of lineups.clock (so first half stoppage
+    # time comes before the second half), ready to be averaged over any window of the match
+    events = bundle.events
+    events = events[events['x'].notna() & events['player'].notna()]
+    return pd.DataFrame({
+        'player': events['player'],
+        'team': events['team'],
+        'clock': lineups.clock(events['period'].to_numpy(np.int32), events['minute'].to_numpy(np.int32),
+                               events['second'].to_numpy(np.int32)),
+        'x': events['x'],
+        'y': events['y'],
+    })
+
+
+def located_events(match_id):
+    # kept on the match bundle, so it leaves the match cache along with the match
+    return fetch_match_bundle(match_id).derived('located_events', _located_events)
+
+
+def first_substitution(match_id):
+    return lineups.first_substitution(fetch_match_bundle(match_id).lineups)
+
+
+def territories(match_id, home_team, start=0, end=None):
+    # average position of every player over [start, end) on lineups.clock, the away team mirrored so both
+    # attack left to right, and the voronoi regions of (home, away); computed once per match and window
+    return fetch_match_bundle(match_id).derived(('territories', home_team, start, end),
+                                                lambda bundle: _territories(bundle, home_team, start, end))
+
+
+def _territories(bundle, home_team, start, end):
+    df = bundle.derived('located_events', _located_events)
+    clock = df['clock'].to_numpy()
+    df = df[(clock >= start) & (clock < end if end is not None else True)]
+    df = df.groupby(['player', 'team'], observed=True)[['x', 'y']].mean().reset_index()
+    # the column responsible for voronoi division must be boolean
+    df['team_id'] = df['team']==home_team
+    df['x'] = df['x'].where(df['team_id'], 120-df['x'])
+    df['y'] = df['y'].where(df['team_id'], 80-df['y'])
+
+    home, away = _pitch.voronoi(df.x, df.y, df.team_id)
+    return df, home, away
+
+
+def territory_windows(match_id, home_team, minutes=15):
+    # territories of consecutive windows of every period, e.g. every 15 minutes from 0:00 and from 45:00,
+    # the last one of a period ending at its last event: [((start, end), territories)] on lineups.clock
+    clock = located_events(match_id)['clock'].to_numpy()
+    step = minutes * 60
+    windows = []
+    for period in np.unique(clock // lineups.PERIOD_SECONDS).tolist():
+        in_period = clock[clock // lineups.PERIOD_SECONDS == period]
+        kick_off, last = lineups.clock(period, KICK_OFF_MINUTES[period], 0), int(in_period.max()) + 1
+        for start in range(kick_off, last, step):
+            windows.append(((start, min(start + step, last)),
+                            territories(match_id, home_team, start, min(start + step, last))))
+    return windows
+
+
+def player_hulls(events):
+    # every player's territory in one pass over located events (as located_events returns them): the
+    # convex hull of their actions within HULL_ZSCORE standard deviations of their mean location in x or
+    # in y, labelled at the mean of those actions, which counts actions inside on both axes twice as the
+    # panel always has
+    xy = events[['x', 'y']].astype(np.float64)
+    keys = [events['team'], events['player']]
+    grouped = xy.groupby(keys, observed=True)
+    zscore = (xy - grouped.transform('mean')) / grouped.transform('std', ddof=0)
+    weight = (zscore.abs() < HULL_ZSCORE).sum(axis=1)
+
+    weighted = xy.mul(weight, axis=0).assign(weight=weight).groupby(keys, observed=True).sum()
+    labels = weighted[['x', 'y']].div(weighted['weight'], axis=0)
+
+    hulls = {}
+    for key, points in xy[weight > 0].groupby([keys[0][weight > 0], keys[1][weight > 0]], observed=True):
+        points = points.to_numpy()
+        try:
+            hulls[key] = points[ConvexHull(points).vertices]
+        except (QhullError, ValueError):
+            # fewer than three actions, or all of them on a line
+            pass
+    labels['hull'] = pd.Series(hulls, dtype=object)
+    return labels.reset_index()
+
+
+def match_hulls(match_id):
+    return fetch_match_bundle(match_id).derived(
+        'hulls', lambda bundle: player_hulls(bundle.derived('located_events', _located_events)))
+
+
+def tournament_hulls(match_ids):
+    # territories of every player over all of the given matches, in a single pass; not kept, only the
+    # located events of each match are (on its bundle)
+    return player_hulls(pd.concat([located_events(match_id) for match_id in match_ids], ignore_index=True))
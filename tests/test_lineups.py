@@ -0,0 +1,64 @@
+import uuid
+
+from attributes import compact_events
+from event_store import flat_events
+from lineups import lineup_table, on_pitch, starting_XI
+from synthetic import generate_match_events
+
+
+HOME, AWAY = 'Germany', 'Scotland'
+
+
+def match(*extra):
+    # the two Starting XI events of a synthetic match followed by the given (period, minute, second,
+    # type, team, player, fields) events, through the same parsing as a stored match
+    events = generate_match_events(4000000, HOME, AWAY, density=1)[:2]
+    squads = {ev['team']['name']: [p['player'] for p in ev['tactics']['lineup']] for ev in events}
+    for period, minute, second, type_name, team, player, fields in extra:
+        ev = {**events[0], 'id': str(uuid.uuid4()), 'index': len(events) + 1, 'period': period,
+              'timestamp': f'00:{minute % 45:02}:{second:02}.000', 'minute': minute, 'second': second,
+              'type': {'id': 0, 'name': type_name}, 'team': events[team == AWAY]['team'],
+              'player': squads[team][player] if isinstance(player, int) else player, **fields}
+        ev.pop('tactics')
+        events.append(ev)
+    return squads, lineup_table(compact_events(flat_events(4000000, events)))
+
+
+def substitution(name):
+    return {'substitution': {'outcome': {'id': 103, 'name': 'Tactical'}, 'replacement': {'id': 1, 'name': name}}}
+
+
+def test_sending_off():
+    squads, lineups = match(
+        (1, 20, 5, 'Foul Committed', HOME, 3, {'foul_committed': {'card': {'id': 5, 'name': 'Red Card'}}}),
+        (2, 60, 0, 'Substitution', AWAY, 7, substitution('Bench Player')),
+        (2, 70, 0, 'Bad Behaviour', AWAY, {'id': 1, 'name': 'Bench Player'},
+         {'bad_behaviour': {'card': {'id': 6, 'name': 'Second Yellow'}}}),
+        (2, 80, 0, 'Player Off', HOME, 5, {'player_off': {'permanent': True}}),
+        (2, 82, 0, 'Player Off', HOME, 6, {}),
+        (2, 83, 0, 'Player On', HOME, 6, {}),
+    )
+    home = [p['name'] for p in squads[HOME]]
+    away = [p['name'] for p in squads[AWAY]]
+
+    assert on_pitch(lineups, HOME, 1, 20, 4) == home
+    assert on_pitch(lineups, HOME, 1, 20, 5) == home[:3] + home[4:]
+    # no one took their place, so they stay in the starting XI
+    assert starting_XI(lineups, HOME) == home
+    assert on_pitch(lineups, AWAY, 2, 65) == away[:7] + away[8:] + ['Bench Player']
+    assert on_pitch(lineups, AWAY, 2, 70) == away[:7] + away[8:]
+    # a permanent Player Off ends the interval, one for treatment does not
+    assert on_pitch(lineups, HOME, 2, 90) == home[:3] + home[4:5] + home[6:]
+
+
+def test_half_time_substitution():
+    squads, lineups = match(
+        (1, 46, 30, 'Pass', HOME, 2, {}),
+        (2, 45, 0, 'Substitution', HOME, 2, substitution('Bench Player')),
+    )
+    home = [p['name'] for p in squads[HOME]]
+
+    # first half stoppage time runs past 45:00 before the substitution
+    assert on_pitch(lineups, HOME, 1, 46, 30) == home
+    assert on_pitch(lineups, HOME, 2, 45, 0) == home[:2] + home[3:] + ['Bench Player']
+    assert starting_XI(lineups, HOME) == home
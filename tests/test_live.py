@@ -0,0 +1,36 @@
+from live import LiveMatch
+from synthetic import generate_match_events
+
+
+HOME, AWAY = 'Germany', 'Scotland'
+
+
+def unlocated(events):
+    return [ev for ev in events if 'location' not in ev]
+
+
+def test_batch_without_located_events():
+    events = generate_match_events(4000000, HOME, AWAY, density=5)
+    live = LiveMatch(4000000, HOME, AWAY)
+
+    # lineups and half starts, then substitutions and half ends on their own
+    assert live.update(events[:4]) == set()
+    assert live.update([ev for ev in events if ev['type']['name'] in ('Substitution', 'Half End')]) == set()
+    assert live.momentum.length == 0
+    assert live.xG == {HOME: [0], AWAY: [0]}
+
+    # the located events still come through afterwards
+    assert 'xT Momentum' in live.update(events[4:])
+    assert live.momentum.length > 0
+
+
+def test_unlocated_batch_between_actions():
+    events = generate_match_events(4000001, HOME, AWAY, density=5)
+    live = LiveMatch(4000001, HOME, AWAY)
+    live.update(events[4:200])
+    n_events, length = live.n_events, live.momentum.length
+    batch = unlocated(events[200:])
+    assert batch
+    assert live.update(batch) <= {'xG Flow', 'xT Momentum'}
+    assert live.n_events == n_events + len(batch)
+    assert live.momentum.length == length
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+import event_store
+from attributes import COMPACT_VERSION, compact_events
+from event_store import flat_events, load_table, save_table
+from match_bundle import MatchBundle, MatchCache
+from synthetic import generate_match_events
+
+
+def test_stale_compact_frame_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_store, 'STORE_DIR', str(tmp_path))
+    os.makedirs(tmp_path / 'compact')
+    events = flat_events(4000000, generate_match_events(4000000, 'Germany', 'Scotland', density=2))
+    event_store._write(events, event_store._path(4000000))
+    # as stored before the period and the cards were kept, without a version
+    save_table('compact/4000000', compact_events(events).drop(columns=['period', 'foul_committed_card']))
+
+    cache = MatchCache(2**30, disk=True)
+    bundle = cache.bundle(4000000)
+    assert cache.disk_hits == 0
+    assert 'period' in bundle.events.columns and 'foul_committed_card' in bundle.events.columns
+    stored, metadata = load_table('compact/4000000')
+    assert metadata['version'] == COMPACT_VERSION
+    assert 'period' in stored.columns
+
+    # served from disk from now on
+    cache.clear()
+    assert cache.bundle(4000000).events.equals(bundle.events)
+    assert cache.disk_hits == 1
+
+
+def test_frames_are_read_only():
+    events = generate_match_events(4000000, 'Germany', 'Scotland', density=2)
+    bundle = MatchBundle(4000000, flat_events(4000000, events))
+    for df, column in ((bundle.passes, 'x'), (bundle.events, 'type'), (bundle.passes, 'minute'),
+                       (bundle.xT, 'xT'), (bundle.lineups, 'off')):
+        before = df[column].iat[0]
+        with pytest.raises(ValueError, match='read-only'):
+            df.loc[df.index[0], column] = df[column].iat[1]
+        with pytest.raises(ValueError, match='read-only'):
+            df[column].array[0] = df[column].iat[1]
+        assert df[column].iat[0] == before
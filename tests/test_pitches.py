@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mplsoccer.pitch import Pitch, VerticalPitch
+
+from pitches import PitchTemplate
+
+
+# the pitches the panels draw
+PITCHES = [
+    (False, dict(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')),
+    (False, dict(pitch_type='statsbomb', pitch_color='#0e1117', line_color='white', line_zorder=2)),
+    (True, dict(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc')),
+    (True, dict(pitch_type='statsbomb', pitch_color='#0e1117', line_color='#c7d5cc', half=True)),
+]
+
+
+def rendered(draw):
+    fig = Figure(figsize=(8, 6), dpi=100, constrained_layout=True)
+    FigureCanvasAgg(fig)
+    fig.patch.set_facecolor('#0e1117')
+    ax = fig.add_subplot()
+    draw(ax)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba()).copy(), ax.get_xlim(), ax.get_ylim(), ax.get_aspect()
+
+
+@pytest.mark.parametrize('vertical, kwargs', PITCHES)
+def test_template_matches_pitch_draw(vertical, kwargs):
+    # PitchTemplate relies on private Pitch methods (_set_axes, _set_background); an mplsoccer release
+    # changing them has to show up here rather than on the dashboards
+    pitch_class = VerticalPitch if vertical else Pitch
+    template = PitchTemplate(pitch_class(**kwargs))
+    expected = rendered(lambda ax: pitch_class(**kwargs).draw(ax=ax))
+    actual = rendered(template.draw)
+    assert actual[1:] == expected[1:]
+    assert np.array_equal(actual[0], expected[0])
@@ -0,0 +1,26 @@
+import time
+
+from profiling import PanelProfile, preparing
+
+
+def test_preparing_moves_time_out_of_the_phase_it_runs_in():
+    profile = PanelProfile('panel', memory=False)
+    with profile.phase('build'):
+        time.sleep(0.02)
+        with preparing():
+            time.sleep(0.05)
+    record = profile.record()
+    assert 0.05 <= record['prepare_s'] < 0.07
+    assert 0.02 <= record['build_s'] < 0.04
+
+
+def test_preparing_without_a_profile():
+    with preparing():
+        pass
+    profile = PanelProfile('panel', memory=False)
+    with profile.phase('build'):
+        pass
+    # nothing is charged once the profiled phase is over
+    with preparing():
+        time.sleep(0.01)
+    assert profile.record()['prepare_s'] == 0.0
@@ -0,0 +1,47 @@
+import uuid
+
+from auxiliary import match_cache
+from event_store import flat_events
+from lineups import clock
+from match_bundle import MatchBundle
+from synthetic import generate_match_events
+from territories import first_substitution, territories, territory_windows
+
+
+HOME, AWAY = 'Germany', 'Scotland'
+
+
+def test_half_time_substitution_keeps_first_half_stoppage_time():
+    events = generate_match_events(4000002, HOME, AWAY, density=1)[:2]
+    squads = {ev['team']['name']: [p['player'] for p in ev['tactics']['lineup']] for ev in events}
+
+    def add(period, minute, second, team, player, **fields):
+        ev = {**events[events[0]['team']['name'] != team], 'id': str(uuid.uuid4()), 'index': len(events) + 1,
+              'period': period, 'timestamp': f'00:{minute % 45:02}:{second:02}.000', 'minute': minute,
+              'second': second, 'type': {'id': 30, 'name': 'Pass'}, 'player': player, **fields}
+        ev.pop('tactics')
+        events.append(ev)
+
+    for period, minute in ((1, 10), (2, 50)):
+        for team, squad in squads.items():
+            for k, player in enumerate(squad):
+                add(period, minute, k, team, player, location=[20.0 + 8 * k, 10.0 + 5 * k + (team == AWAY)])
+    # a pass in first half stoppage time, and a substitution as the second half kicks off at 45:00
+    add(1, 46, 30, HOME, squads[HOME][9], location=[100.0, 40.0])
+    add(2, 45, 0, HOME, squads[HOME][9], type={'id': 19, 'name': 'Substitution'},
+        substitution={'outcome': {'id': 103, 'name': 'Tactical'},
+                      'replacement': {'id': 1, 'name': 'Bench Player'}})
+    events.sort(key=lambda ev: (ev['period'], ev['minute'], ev['second']))
+
+    match_cache.put(4000002, MatchBundle(4000002, flat_events(4000002, events)))
+    try:
+        df = territories(4000002, HOME, end=first_substitution(4000002))[0]
+        player = df[df['player'] == squads[HOME][9]['name']]
+        # averaged with the stoppage time pass
+        assert player['x'].iloc[0] == (20.0 + 8 * 9 + 100.0) / 2
+
+        windows = [window for window, _ in territory_windows(4000002, HOME, minutes=60)]
+        # the first half runs into its stoppage time, the second half starts at 45:00 of period 2
+        assert windows == [(clock(1, 0, 0), clock(1, 46, 31)), (clock(2, 45, 0), clock(2, 50, 11))]
+    finally:
+        match_cache.clear()
@@ -0,0 +1,125 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from auxiliary import fetch_match_bundle, get_matches, get_starting_XI
+from cache import BoundedCache
+from event_store import save_table, load_table
+from match_bundle import grid_template, sizeof
+from profiling import preparing
+
+
+# bump whenever the partials below change so that stored ones are recomputed
+PARTIALS_VERSION = 1
+# same bins as the single match heatmaps in get_viz
+GRID_BINS = {'pressures': (8, 6), 'xT': (12, 9)}
+SHOT_COLUMNS = ['team', 'player', 'minute', 'x', 'y', 'xg', 'outcome']
+
+# partials of the matches seen by the process within their own byte budget, without holding the
+# match bundles they were computed from; the store keeps every one of them
+partials_cache = BoundedCache(int(os.environ.get('EURO_PARTIALS_CACHE_MB', 64)) * 2**20, sizeof=sizeof)
+_partials_lock = threading.Lock()
+
+
+def _grid_rows(team, grid, statistic):
+    # a bin grid as (team, grid, bin, value) rows, so grids of many matches merge with a groupby sum
+    return pd.DataFrame({'team': team, 'grid': grid, 'bin': np.arange(statistic.size), 'value': statistic.ravel()})
+
+
+def compute_match_partials(match_id):
+    # everything the tournament panels need from one match, for both teams; small enough to keep for
+    # every match and additive, so a team's tournament is the sum of its matches
+    bundle = fetch_match_bundle(match_id)
+    teams = bundle.events['team'].dropna().unique()
+    grids, pairs, positions = [], [], []
+    for team in teams:
+        for grid, bins in GRID_BINS.items():
+            grids.append(_grid_rows(team, grid, bundle.grid(team, grid, bins)['statistic']))
+
+        # the passing network only links players of the starting XI, as the single match one does
+        passes = bundle.passes[(bundle.passes['team']==team) & bundle.passes['recipient'].notna()]
+        startingXI = get_starting_XI(match_id, team)
+        passes = passes[passes['player'].isin(startingXI) & passes['recipient'].isin(startingXI)]
+        pairs.append(passes.groupby(['player', 'recipient'], observed=True).size().rename('passes').reset_index().assign(team=team))
+        positions.append(passes.groupby('player', observed=True).agg(x_sum=('x', 'sum'), y_sum=('y', 'sum'), passes=('x', 'size'))
+                         .reset_index().assign(team=team))
+
+    return {
+        'grids': pd.concat(grids, ignore_index=True),
+        'pass_pairs': pd.concat(pairs, ignore_index=True)[['team', 'player', 'recipient', 'passes']],
+        'positions': pd.concat(positions, ignore_index=True)[['team', 'player', 'x_sum', 'y_sum', 'passes']],
+        'shots': bundle.shots[SHOT_COLUMNS].reset_index(drop=True),
+    }
+
+
+def match_partials(match_id):
+    # memory, then the store, and only computed (and stored) the first time a match is seen
+    match_id = int(match_id)
+    partials = partials_cache.get(match_id)
+    if partials is not None:
+        return partials
+    # stored or computed, it is data preparation all the same
+    with _partials_lock, preparing():
+        partials = partials_cache.get(match_id)
+        if partials is not None:
+            return partials
+        partials = {}
+        for name in ('grids', 'pass_pairs', 'positions', 'shots'):
+            stored = load_table(f'partials/{match_id}.{name}')
+            if stored is None or stored[1].get('version') != PARTIALS_VERSION:
+                break
+            partials[name] = stored[0]
+        else:
+            partials_cache.put(match_id, partials)
+            return partials
+
+        partials = compute_match_partials(match_id)
+        for name, df in partials.items():
+            save_table(f'partials/{match_id}.{name}', df, {'version': PARTIALS_VERSION})
+        partials_cache.put(match_id, partials)
+    return partials
+
+
+def team_match_ids(match_id, team):
+    # the team's matches up to and including match_id, so a panel never changes once rendered
+    matches = get_matches().sort_values(['match_date', 'kick_off'])
+    matches = matches[(matches['home_team']==team) | (matches['away_team']==team)]
+    ids = list(matches['match_id'])
+    return ids[:ids.index(match_id) + 1] if match_id in ids else ids
+
+
+def _merged(match_ids, name, team):
+    frames = [match_partials(match_id)[name] for match_id in match_ids]
+    df = pd.concat(frames, ignore_index=True)
+    return df[df['team']==team]
+
+
+def tournament_grid(match_ids, team, grid):
+    # summed bin grid in the layout returned by Pitch.bin_statistic, ready for pitch.heatmap
+    template = grid_template(GRID_BINS[grid])
+    values = _merged(match_ids, 'grids', team)
+    values = values[values['grid']==grid].groupby('bin')['value'].sum()
+    statistic = np.zeros(template['statistic'].size)
+    statistic[values.index.to_numpy()] = values.to_numpy()
+    template['statistic'] = statistic.reshape(template['statistic'].shape)
+    return template
+
+
+def tournament_passing_network(match_ids, team):
+    # (average_location, passes_between) like passing_network builds them, counts summed over the matches
+    positions = _merged(match_ids, 'positions', team).groupby('player', observed=True)[['x_sum', 'y_sum', 'passes']].sum()
+    average_location = pd.DataFrame({'x': positions['x_sum'] / positions['passes'],
+                                     'y': positions['y_sum'] / positions['passes'],
+                                     'count': positions['passes']})
+    passes_between = (_merged(match_ids, 'pass_pairs', team).groupby(['player', 'recipient'], observed=True)['passes'].sum()
+                      .rename('pass_count').reset_index())
+    passes_between = passes_between.merge(average_location[['x', 'y']], left_on='player', right_index=True)
+    passes_between = passes_between.merge(average_location[['x', 'y']], left_on='recipient', right_index=True,
+                                          suffixes=('', '_end'))
+    return average_location, passes_between
+
+
+def tournament_shots(match_ids, team):
+    return _merged(match_ids, 'shots', team).reset_index(drop=True)
@@ -0,0 +1,54 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+PITCH_LENGTH, PITCH_WIDTH = 120, 80
+XT_GRID_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'xT_Grid.csv')
+XT_COLUMNS = ['player', 'team', 'minute', 'second', 'start_x', 'start_y', 'end_x', 'end_y', 'type', 'xT']
+
+
+@lru_cache(maxsize=None)
+def load_xT_grid(path=XT_GRID_PATH):
+    # rows run along the pitch width, columns along its length
+    grid = np.loadtxt(path, delimiter=',')
+    grid.flags.writeable = False
+    return grid
+
+
+def zone_bins(x, y, shape):
+    rows, cols = shape
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x_bin = np.clip(np.nan_to_num(x * (cols / PITCH_LENGTH)).astype(np.intp), 0, cols - 1)
+    y_bin = np.clip(np.nan_to_num(y * (rows / PITCH_WIDTH)).astype(np.intp), 0, rows - 1)
+    return x_bin, y_bin
+
+
+def zone_values(x, y, grid=None):
+    grid = load_xT_grid() if grid is None else grid
+    x_bin, y_bin = zone_bins(x, y, grid.shape)
+    values = grid[y_bin, x_bin]
+    # missing coordinates stay missing instead of silently landing in a corner zone
+    return np.where(np.isnan(np.asarray(x, dtype=np.float64)) | np.isnan(np.asarray(y, dtype=np.float64)),
+                    np.nan, values)
+
+
+def action_xT(start_x, start_y, end_x, end_y, grid=None):
+    # xT added by moving the ball from the start zone to the end zone
+    return zone_values(end_x, end_y, grid) - zone_values(start_x, start_y, grid)
+
+
+def xT_actions(events, types=('Pass', 'Carry')):
+    # one row per pass/carry with the xT it added, the base of every xT panel;
+    # expects the typed coordinate columns from attributes.extract_attributes
+    frames = []
+    for type in types:
+        df = events[events['type']==type]
+        df = df.rename(columns={'x': 'start_x', 'y': 'start_y'})
+        frames.append(df[XT_COLUMNS[:-1]])
+    actions = pd.concat(frames, axis=0, ignore_index=True)
+    actions['xT'] = action_xT(actions['start_x'], actions['start_y'], actions['end_x'], actions['end_y'])
+    return actions